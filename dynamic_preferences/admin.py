@@ -87,7 +87,10 @@ class GlobalPreferenceAdmin(DynamicPreferenceAdmin):
     def get_queryset(self, *args, **kwargs):
         # Instanciate default prefs
         manager = global_preferences_registry.manager()
-        manager.all()
+        if preferences_settings.ENABLE_SPARSE_STORAGE:
+            manager.create_missing_db_prefs()
+        else:
+            manager.all()
         return super(GlobalPreferenceAdmin, self).get_queryset(*args, **kwargs)
 
 
@@ -47,7 +47,11 @@ class PreferenceViewSet(
 
     def init_preferences(self):
         manager = self.get_manager()
-        manager.all()
+        if preferences_settings.ENABLE_SPARSE_STORAGE:
+            # the API works on database entries, so they must exist
+            manager.create_missing_db_prefs()
+        else:
+            manager.all()
 
     def get_object(self):
         """
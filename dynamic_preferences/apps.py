@@ -22,3 +22,6 @@ class DynamicPreferencesConfig(AppConfig):
         # installed apps
         app_names = [app.name for app in apps.app_configs.values()]
         global_preferences_registry.autodiscover(app_names)
+
+        if preferences_settings.FREEZE_REGISTRIES:
+            preference_models.freeze()
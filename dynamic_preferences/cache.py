@@ -0,0 +1,155 @@
+"""
+An in-process cache that keeps deserialized preference values in front of
+django's cache framework, so hot preferences can be read without any network
+round-trip or deserialization.
+"""
+
+import threading
+import time
+
+from collections import OrderedDict
+
+from asgiref.local import Local
+from django.core.signals import request_finished, request_started
+
+from .settings import preferences_settings
+
+#: Use the ``LOCAL_CACHE_TIMEOUT`` setting, see :py:class:`LocalCache`
+DEFAULT_TIMEOUT = object()
+
+
+class LocalCache(object):
+    """
+    A thread-safe, size-bounded LRU cache with an optional time to live.
+
+    :param max_size: the maximum number of entries to keep, defaults to the
+        ``LOCAL_CACHE_MAX_SIZE`` setting
+    :param timeout: the number of seconds an entry stays valid, defaults to
+        the ``LOCAL_CACHE_TIMEOUT`` setting. ``None`` means forever.
+    """
+
+    def __init__(self, max_size=None, timeout=DEFAULT_TIMEOUT):
+        self._max_size = max_size
+        self._timeout = timeout
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def max_size(self):
+        if self._max_size is None:
+            return preferences_settings.LOCAL_CACHE_MAX_SIZE
+        return self._max_size
+
+    @property
+    def timeout(self):
+        if self._timeout is DEFAULT_TIMEOUT:
+            return preferences_settings.LOCAL_CACHE_TIMEOUT
+        return self._timeout
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                expires, value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return default
+
+            if expires is not None and expires <= time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return default
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        timeout = self.timeout
+        expires = None if timeout is None else time.monotonic() + timeout
+        max_size = self.max_size
+        with self._lock:
+            self._data[key] = (expires, value)
+            self._data.move_to_end(key)
+            while len(self._data) > max_size:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        """Return a dictionary with hits, misses, evictions and current size"""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self._data),
+        }
+
+    def __len__(self):
+        return len(self._data)
+
+
+#: The per-process cache used by :py:class:`managers.PreferencesManager`
+local_cache = LocalCache()
+
+
+class RequestCache(object):
+    """
+    Values kept until the end of the current request. Outside of a request,
+    e.g. in management commands, nothing is kept.
+    """
+
+    def __init__(self):
+        self._local = Local()
+
+    def start(self, **kwargs):
+        self._local.data = {}
+
+    def finish(self, **kwargs):
+        self._local.data = None
+
+    @property
+    def data(self):
+        return getattr(self._local, "data", None)
+
+    def get(self, key, default=None):
+        data = self.data
+        if data is None:
+            return default
+        return data.get(key, default)
+
+    def set(self, key, value):
+        data = self.data
+        if data is not None:
+            data[key] = value
+
+    def setdefault(self, key, default):
+        """Return the value stored for key, or None outside of a request"""
+        data = self.data
+        if data is None:
+            return None
+        return data.setdefault(key, default)
+
+    def delete(self, *keys):
+        data = self.data
+        if data is not None:
+            for key in keys:
+                data.pop(key, None)
+
+
+#: Values shared by :py:class:`managers.PreferencesManager` during a request
+request_cache = RequestCache()
+
+request_started.connect(request_cache.start)
+request_finished.connect(request_cache.finish)
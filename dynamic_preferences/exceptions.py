@@ -23,6 +23,10 @@ class DoesNotExist(DynamicPreferencesException):
     detail_default = "Cannot retrieve preference value, ensure the preference is correctly registered and database is synced"
 
 
+class RegistryFrozen(DynamicPreferencesException):
+    detail_default = "Cannot register preferences in a frozen registry"
+
+
 class CachedValueNotFound(DynamicPreferencesException):
     detail_default = "Cached value not found"
 
@@ -108,14 +108,11 @@ def preference_form_builder(form_base_class, preferences=[], **kwargs):
     else:
         manager_kwargs = {"instance": kwargs.get("instance", None)}
     manager = registry.manager(**manager_kwargs)
+    db_prefs = manager.get_db_prefs(preferences_obj)
 
     for preference in preferences_obj:
-        f = preference.field
-        instance = manager.get_db_pref(
-            section=preference.section.name, name=preference.name
-        )
-        f.initial = instance.value
-        fields[preference.identifier()] = f
+        instance = db_prefs[preference.identifier()]
+        fields[preference.identifier()] = preference.setup_field(initial=instance.value)
         instances.append(instance)
 
     form_class = type("Custom" + form_base_class.__name__, (form_base_class,), {})
@@ -138,12 +135,17 @@ class PreferenceForm(forms.Form):
     registry = None
 
     def update_preferences(self, **kwargs):
+        """
+        Save the changed preferences, comparing submitted values with
+        the database entries loaded by the form builder
+        """
+        db_prefs = {}
+        values = {}
         for instance in self.instances:
-            self.manager.update_db_pref(
-                instance.preference.section.name,
-                instance.preference.name,
-                self.cleaned_data[instance.preference.identifier()],
-            )
+            identifier = instance.preference.identifier()
+            db_prefs[identifier] = instance
+            values[instance.preference] = self.cleaned_data[identifier]
+        self.manager.update_db_prefs(values, db_prefs=db_prefs)
 
 
 class GlobalPreferenceForm(PreferenceForm):
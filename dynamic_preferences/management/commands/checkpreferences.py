@@ -42,7 +42,10 @@ class Command(BaseCommand):
         )
 
     def handle(self, *args, **options):
-        skip_create = options["skip_create"]
+        # with sparse storage, entries are only created when a value is set
+        skip_create = (
+            options["skip_create"] or preferences_settings.ENABLE_SPARSE_STORAGE
+        )
 
         # Create needed preferences
         # Global
@@ -3,9 +3,23 @@ try:
 except ImportError:
     from collections import Mapping
 
+import copy
+import time
+
+from django.db import router, transaction
+
+from .cache import local_cache, request_cache
+from .serializers import InstanciatedSerializer
 from .settings import preferences_settings
 from .exceptions import CachedValueNotFound, DoesNotExist
-from .signals import preference_updated
+from .signals import has_update_listeners, send_preference_updated
+
+
+#: Where prefetched preferences values are stored on model instances
+PREFETCHED_PREFERENCES_ATTRIBUTE = "_prefetched_preferences_cache"
+
+#: Where the preferences manager is stored on model instances
+MANAGER_CACHE_ATTRIBUTE = "_preferences_manager_cache"
 
 
 class PreferencesManager(Mapping):
@@ -16,6 +30,14 @@ class PreferencesManager(Mapping):
         self.model = model
         self.registry = registry
         self.instance = kwargs.get("instance")
+        #: values loaded ahead of time by identifier, see prefetch_preferences()
+        self.prefetched = kwargs.get("prefetched")
+        if self.prefetched is None:
+            self.prefetched = {}
+        #: if true, values read are kept until the end of the request, see remembered
+        self.remember_values = kwargs.get("remember_values", False)
+        self._cache_key_prefix = None
+        self._cache_keys = {}
 
     @property
     def queryset(self):
@@ -33,6 +55,11 @@ class PreferencesManager(Mapping):
     def __getitem__(self, key):
         return self.get(key)
 
+    def __reduce__(self):
+        # managers are stored on model instances, which may be pickled,
+        # but registries can't be: the manager is rebuilt on first access
+        return (_unpickle_manager, ())
+
     def __setitem__(self, key, value):
         section, name = self.parse_lookup(key)
         preference = self.registry.get(section=section, name=name, fallback=False)
@@ -58,16 +85,177 @@ class PreferencesManager(Mapping):
     def get_by_name(self, name):
         return self.get(self.registry.get_by_name(name).identifier())
 
+    @property
+    def cache_key_prefix(self):
+        """
+        The part shared by every cache key of this manager, which includes
+        the instance primary key for per-instance preferences
+        """
+        pk = self.instance.pk if self.instance else None
+        if self._cache_key_prefix is None or self._cache_key_prefix[0] != pk:
+            if self.instance:
+                prefix = "dynamic_preferences_{0}_{1}".format(self.model.__name__, pk)
+                self._cache_keys = {}
+            else:
+                prefix = "dynamic_preferences_{0}".format(self.model.__name__)
+                self._cache_keys = self.registry.cache_keys(prefix)
+            self._cache_key_prefix = (pk, prefix)
+        return self._cache_key_prefix[1]
+
     def get_cache_key(self, section, name):
         """Return the cache key corresponding to a given preference"""
-        if not self.instance:
-            return "dynamic_preferences_{0}_{1}_{2}".format(
-                self.model.__name__, section, name
-            )
-        return "dynamic_preferences_{0}_{1}_{2}_{3}".format(
-            self.model.__name__, self.instance.pk, section, name, self.instance.pk
+        prefix = self.cache_key_prefix
+        try:
+            return self._cache_keys[section, name]
+        except KeyError:
+            pass
+        try:
+            key = prefix + self.registry.cache_key_suffixes()[section, name]
+        except KeyError:
+            # not a registered preference, e.g. an obsolete database entry
+            return "{0}_{1}_{2}".format(prefix, section, name)
+        self._cache_keys[section, name] = key
+        return key
+
+    def get_remembered_key(self):
+        """Return the request cache key holding the values read during the request"""
+        return self.cache_key_prefix + "_values"
+
+    @property
+    def remembered(self):
+        """
+        The values read during the current request through the managers of
+        our instance, by identifier. None outside of a request.
+        """
+        if not self.remember_values or self.instance.pk is None:
+            return None
+        return request_cache.setdefault(self.get_remembered_key(), {})
+
+    def copy_values(self, values):
+        """Return a copy of a dictionary of values, that can be changed safely"""
+        preferences = self.registry.preferences_by_identifier()
+        return {
+            identifier: preferences[identifier].serializer.copy_value(value)
+            for identifier, value in values.items()
+        }
+
+    def get_generation_key(self):
+        """
+        Return the cache key holding the generation of this registry
+        (or of this instance for per-instance preferences)
+        """
+        return self.cache_key_prefix + "_generation"
+
+    def get_generation(self):
+        """
+        Return the current generation, a number that is bumped every time
+        a preference is written, by any process.
+
+        It is read from the django cache once per request: writes made by
+        other processes during a request are seen on the next one.
+        """
+        key = self.get_generation_key()
+        generation = request_cache.get(key)
+        if generation is not None:
+            return generation
+        generation = self.cache.get(key)
+        if generation is None:
+            # the key is missing or was evicted: we start from an arbitrary,
+            # always increasing value so we never reuse a previous generation
+            self.cache.add(key, time.time_ns())
+            generation = self.cache.get(key)
+        request_cache.set(key, generation)
+        return generation
+
+    def bump_generation(self):
+        """Invalidate values cached in every process' local cache"""
+        if not preferences_settings.ENABLE_LOCAL_CACHE:
+            return
+        key = self.get_generation_key()
+        try:
+            self.cache.incr(key)
+        except ValueError:
+            self.cache.set(key, time.time_ns())
+        request_cache.delete(key)
+
+    def get_snapshot_key(self):
+        """
+        Return the cache key holding the raw values of every preference of
+        this registry (or of this instance for per-instance preferences)
+        """
+        return self.cache_key_prefix + "_snapshot"
+
+    def from_snapshot(self, preferences):
+        """
+        Return the values of the given preferences from the cached snapshot.
+        The snapshot must contain all of them.
+        """
+        snapshot = self.cache.get(self.get_snapshot_key())
+        if snapshot is None:
+            raise CachedValueNotFound
+        try:
+            raw_values = [
+                (p.identifier(), p, snapshot[p.identifier()]) for p in preferences
+            ]
+        except KeyError:
+            # a preference was registered after the snapshot was built
+            raise CachedValueNotFound
+        return self.deserialize_many(raw_values)
+
+    def rebuild_snapshot(self, preferences):
+        """
+        Rebuild the snapshot from the cached values of every preference, and
+        return the values of the given preferences. Nothing is returned if
+        some values are not cached.
+        """
+        raw_values = self.many_raw_from_cache(self.registry.preferences())
+        if len(raw_values) < len(self.registry.preferences()):
+            return {}
+        self.cache.set(self.get_snapshot_key(), raw_values)
+        return self.deserialize_many(
+            (p.identifier(), p, raw_values[p.identifier()]) for p in preferences
         )
 
+    def to_snapshot(self, *prefs, defaults=()):
+        """
+        Store the raw values of the given preference model instances as
+        a single cache entry
+
+        :param defaults: preferences without database entry, that should
+            resolve to their default value
+        """
+        snapshot = {pref.preference.identifier(): pref.raw_value for pref in prefs}
+        for preference in defaults:
+            snapshot[preference.identifier()] = preferences_settings.CACHE_DEFAULT_VALUE
+        self.cache.set(self.get_snapshot_key(), snapshot)
+
+    def refresh_cache(self, *prefs):
+        """
+        Update caches after the given preference model instances were written
+        """
+        for pref in prefs:
+            self.forget_prefetched(pref.section, pref.name)
+        self.to_cache(*prefs)
+        self.bump_generation()
+        if preferences_settings.ENABLE_CACHE_SNAPSHOT:
+            # the snapshot will be rebuilt on next full read
+            self.cache.delete(self.get_snapshot_key())
+
+    def forget_cache(self, *prefs):
+        """
+        Remove the cached values of the given preference model instances,
+        e.g. after they were deleted
+        """
+        keys = [self.get_cache_key(pref.section, pref.name) for pref in prefs]
+        for pref in prefs:
+            self.forget_prefetched(pref.section, pref.name)
+        self.cache.delete_many(keys)
+        if preferences_settings.ENABLE_LOCAL_CACHE:
+            local_cache.delete(*keys)
+        self.bump_generation()
+        if preferences_settings.ENABLE_CACHE_SNAPSHOT:
+            self.cache.delete(self.get_snapshot_key())
+
     def from_cache(self, section, name):
         """Return a preference raw_value from cache"""
         cached_value = self.cache.get(
@@ -77,49 +265,151 @@ class PreferencesManager(Mapping):
         if cached_value is CachedValueNotFound:
             raise CachedValueNotFound
 
+        return self.deserialize(
+            self.registry.get(section=section, name=name), cached_value
+        )
+
+    def deserialize(self, preference, cached_value):
+        """Return the value of a preference from its cached raw value"""
+        if cached_value == preferences_settings.CACHE_DEFAULT_VALUE:
+            # the preference has no database entry, see ENABLE_SPARSE_STORAGE
+            return self.build_db_pref(
+                preference.section.name, preference.name, preference.get("default")
+            ).value
         if cached_value == preferences_settings.CACHE_NONE_VALUE:
             cached_value = None
-        return self.registry.get(section=section, name=name).serializer.deserialize(
-            cached_value
+        return preference.serializer.deserialize(cached_value)
+
+    def deserialize_many(self, raw_values):
+        """
+        Return a dictionary of values from ``(key, preference, cached value)``
+        tuples. The model instances referenced by model preferences are
+        fetched with a single query per model.
+        """
+        values = {}
+        batches = {}
+        for key, preference, cached_value in raw_values:
+            serializer = preference.serializer
+            if not hasattr(serializer, "to_python_many"):
+                values[key] = self.deserialize(preference, cached_value)
+                continue
+
+            if cached_value == preferences_settings.CACHE_DEFAULT_VALUE:
+                cached_value = self.build_db_pref(
+                    preference.section.name, preference.name, preference.get("default")
+                ).raw_value
+            elif cached_value == preferences_settings.CACHE_NONE_VALUE:
+                cached_value = None
+            # the value is set below, we only keep the keys order
+            values[key] = None
+            batch = batches.setdefault(
+                (
+                    serializer.__class__,
+                    serializer.model,
+                    serializer.cache_instance,
+                    getattr(serializer, "lazy_value", False),
+                ),
+                (serializer, [], []),
+            )
+            batch[1].append(key)
+            batch[2].append(cached_value)
+
+        for serializer, keys, batch_values in batches.values():
+            values.update(zip(keys, serializer.to_python_many(batch_values)))
+        return values
+
+    def is_locally_cacheable(self, preference):
+        """
+        Model and file preferences return objects bound to the database
+        or to a storage, we never share those between requests
+        """
+        return preferences_settings.ENABLE_LOCAL_CACHE and not isinstance(
+            preference.serializer, InstanciatedSerializer
+        )
+
+    def from_local_cache(self, preference, generation):
+        """
+        Return a deserialized preference value from the in-process cache,
+        if it was cached during the given generation
+        """
+        entry = local_cache.get(
+            self.get_cache_key(preference.section.name, preference.name)
         )
+        if entry is None or generation is None or entry[0] != generation:
+            raise CachedValueNotFound
+        # callers may mutate the values we return (e.g. lists)
+        return copy.copy(entry[1])
+
+    def to_local_cache(self, preference, value, generation):
+        if generation is not None and self.is_locally_cacheable(preference):
+            local_cache.set(
+                self.get_cache_key(preference.section.name, preference.name),
+                (generation, copy.copy(value)),
+            )
 
     def many_from_cache(self, preferences):
         """
         Return cached value for given preferences
         missing preferences will be skipped
         """
-        keys = {p: self.get_cache_key(p.section.name, p.name) for p in preferences}
-        cached = self.cache.get_many(list(keys.values()))
+        raw_values = self.many_raw_from_cache(preferences)
+        return self.deserialize_many(
+            (p.identifier(), p, raw_values[p.identifier()])
+            for p in preferences
+            if p.identifier() in raw_values
+        )
 
-        for k, v in cached.items():
-            # we replace dummy cached values by None here, if needed
-            if v == preferences_settings.CACHE_NONE_VALUE:
-                cached[k] = None
+    def many_raw_from_cache(self, preferences):
+        """
+        Return the cached raw values of the given preferences, by identifier.
+        Missing preferences are skipped
+        """
+        keys = [self.get_cache_key(p.section.name, p.name) for p in preferences]
+        cached = self.cache.get_many(keys)
 
         # we have to remap returned value since the underlying cached keys
         # are not usable for an end user
         return {
-            p.identifier(): p.serializer.deserialize(cached[k])
-            for p, k in keys.items()
-            if k in cached
+            p.identifier(): cached[k] for p, k in zip(preferences, keys) if k in cached
         }
 
     def to_cache(self, *prefs):
         """
         Update/create the cache value for the given preference model instances
         """
-        update_dict = {}
-        for pref in prefs:
-            key = self.get_cache_key(pref.section, pref.name)
-            value = pref.raw_value
-            if value is None or value == "":
-                # some cache backends refuse to cache None or empty values
-                # resulting in more DB queries, so we cache an arbitrary value
-                # to ensure the cache is hot (even with empty values)
-                value = preferences_settings.CACHE_NONE_VALUE
-            update_dict[key] = value
+        update_dict = {
+            self.get_cache_key(pref.section, pref.name): self.get_cache_value(pref)
+            for pref in prefs
+        }
 
         self.cache.set_many(update_dict)
+        if preferences_settings.ENABLE_LOCAL_CACHE:
+            local_cache.delete(*update_dict.keys())
+
+    def get_cache_value(self, pref):
+        """Return the value to cache for the given preference model instance"""
+        value = pref.raw_value
+        if value is None or value == "":
+            # some cache backends refuse to cache None or empty values
+            # resulting in more DB queries, so we cache an arbitrary value
+            # to ensure the cache is hot (even with empty values)
+            value = preferences_settings.CACHE_NONE_VALUE
+        return value
+
+    def to_cache_defaults(self, *preferences):
+        """
+        Mark the given preferences as having no database entry in the cache,
+        so reading them resolves to their default value
+        """
+        update_dict = {
+            self.get_cache_key(p.section.name, p.name): (
+                preferences_settings.CACHE_DEFAULT_VALUE
+            )
+            for p in preferences
+        }
+        self.cache.set_many(update_dict)
+        if preferences_settings.ENABLE_LOCAL_CACHE:
+            local_cache.delete(*update_dict.keys())
 
     def pref_obj(self, section, name):
         return self.registry.get(section=section, name=name)
@@ -136,62 +426,324 @@ class PreferencesManager(Mapping):
         """Return the value of a single preference using a dotted path key
         :arg no_cache: if true, the cache is bypassed
         """
-        section, name = self.parse_lookup(key)
-        preference = self.registry.get(section=section, name=name, fallback=False)
+        try:
+            preference = self.registry.preferences_by_identifier()[key]
+            section, name = preference.section.name, preference.name
+        except KeyError:
+            section, name = self.parse_lookup(key)
+            preference = self.registry.get(section=section, name=name, fallback=False)
         if no_cache or not preferences_settings.ENABLE_CACHE:
             return self.get_db_pref(section=section, name=name).value
 
+        remembered = self.remembered
+        for store in (self.prefetched, remembered):
+            if store:
+                try:
+                    # callers may mutate the values we return (e.g. lists)
+                    return preference.serializer.copy_value(
+                        store[preference.identifier()]
+                    )
+                except KeyError:
+                    pass
+
+        local = self.is_locally_cacheable(preference)
+        if local:
+            # the generation must be read before the value, so a concurrent
+            # write can only make us discard a fresh value, never keep a stale one
+            generation = self.get_generation()
+            try:
+                return self.from_local_cache(preference, generation)
+            except CachedValueNotFound:
+                pass
+
         try:
-            return self.from_cache(section, name)
+            value = self.from_cache(section, name)
         except CachedValueNotFound:
-            pass
+            db_pref = self.get_db_pref(section=section, name=name)
+            if db_pref.pk is None:
+                self.to_cache_defaults(preference)
+            else:
+                self.to_cache(db_pref)
+            value = db_pref.value
 
-        db_pref = self.get_db_pref(section=section, name=name)
-        self.to_cache(db_pref)
-        return db_pref.value
+        if local:
+            self.to_local_cache(preference, value, generation)
+        if remembered is not None:
+            remembered[preference.identifier()] = preference.serializer.copy_value(
+                value
+            )
+        return value
 
     def get_db_pref(self, section, name):
         try:
-            pref = self.queryset.get(section=section, name=name)
+            pref = self.bind(self.queryset.get(section=section, name=name))
         except self.model.DoesNotExist:
             pref_obj = self.pref_obj(section=section, name=name)
+            if preferences_settings.ENABLE_SPARSE_STORAGE:
+                # the entry will be created when the value is actually set
+                return self.build_db_pref(
+                    section=section, name=name, value=pref_obj.get("default")
+                )
             pref = self.create_db_pref(
                 section=section, name=name, value=pref_obj.get("default")
             )
 
         return pref
 
-    def update_db_pref(self, section, name, value):
-        try:
-            db_pref = self.queryset.get(section=section, name=name)
-            old_value = db_pref.value
-            db_pref.value = value
-            db_pref.save()
-            preference_updated.send(
-                sender=self.__class__,
-                section=section,
-                name=name,
-                old_value=old_value,
-                new_value=value,
+    def get_db_prefs(self, preferences):
+        """
+        Return the database entries of the given preferences by identifier,
+        fetched with a single query. Like :py:meth:`get_db_pref`, missing
+        entries are created (in bulk), or only built with ENABLE_SPARSE_STORAGE.
+        """
+        identifiers = {p.identifier() for p in preferences}
+        db_prefs = {
+            db_pref.preference.identifier(): self.bind(db_pref)
+            for db_pref in self.queryset.filter(name__in={p.name for p in preferences})
+            if db_pref.preference.identifier() in identifiers
+        }
+        missing = [p for p in preferences if p.identifier() not in db_prefs]
+        if not missing:
+            return db_prefs
+
+        if preferences_settings.ENABLE_SPARSE_STORAGE:
+            for preference in missing:
+                db_prefs[preference.identifier()] = self.build_db_pref(
+                    preference.section.name, preference.name, preference.get("default")
+                )
+            return db_prefs
+
+        created = [self.bind(db_pref) for db_pref in self.create_db_prefs(missing)]
+        if created:
+            self.refresh_cache(*created)
+        db_prefs.update(
+            {db_pref.preference.identifier(): db_pref for db_pref in created}
+        )
+        return db_prefs
+
+    def bind(self, db_pref):
+        """
+        Attach our instance to a preference model instance fetched from the
+        database, so it is not fetched again when the preference is saved
+        """
+        if self.instance:
+            db_pref.instance = self.instance
+        return db_pref
+
+    def forget_prefetched(self, section, name):
+        """Drop a prefetched value, after it was written"""
+        # values may also be stored on our instance by another manager,
+        # or be remembered by the manager of another copy of our instance
+        stores = [self.prefetched]
+        if self.instance:
+            stores.append(self.instance.__dict__.get(PREFETCHED_PREFERENCES_ATTRIBUTE))
+            stores.append(request_cache.get(self.get_remembered_key()))
+        identifier = name
+        if section:
+            identifier = preferences_settings.SECTION_KEY_SEPARATOR.join([section, name])
+        for store in stores:
+            if store:
+                store.pop(identifier, None)
+
+    def update_db_pref(self, section, name, value, force=False):
+        """
+        Persist a new value for the given preference, with a single query
+        when the database entry exists and nobody listens to
+        :py:data:`signals.preference_updated`.
+
+        Since the entry is updated in place, ``post_save`` is not sent.
+        If the serialized value did not change, the cache is left untouched
+        and no signal is sent, unless ``force`` is True.
+
+        Nothing is returned, use :py:meth:`get_db_pref` to get the entry.
+        """
+        self.forget_prefetched(section, name)
+        db_pref = self.build_db_pref(section, name, value)
+        queryset = self.queryset.filter(section=section, name=name)
+
+        if not has_update_listeners(self.__class__):
+            if force:
+                updated = queryset.update(raw_value=db_pref.raw_value)
+            else:
+                updated = queryset.exclude(raw_value=db_pref.raw_value).update(
+                    raw_value=db_pref.raw_value
+                )
+                if not updated and queryset.exists():
+                    # the value is unchanged
+                    return
+            if updated:
+                self.refresh_cache(db_pref)
+            else:
+                self._create_db_pref(db_pref)
+            return
+
+        # receivers need the previous value
+        old_raw_values = list(queryset.values_list("raw_value", flat=True)[:1])
+        if old_raw_values:
+            old_raw_value = old_raw_values[0]
+            if old_raw_value == db_pref.raw_value and not force:
+                return
+            queryset.update(raw_value=db_pref.raw_value)
+            self.refresh_cache(db_pref)
+        else:
+            # the preference had its default value, e.g. with ENABLE_SPARSE_STORAGE
+            old_raw_value = self.get_default_raw_value(db_pref.preference)
+            db_pref = self._create_db_pref(db_pref)
+            if old_raw_value == db_pref.raw_value and not force:
+                return
+        old_value = db_pref.preference.serializer.deserialize(old_raw_value)
+        send_preference_updated(
+            self.__class__,
+            [(section, name, old_value, value)],
+            using=router.db_for_write(self.model),
+        )
+
+    def update_many(self, values, force=False):
+        """
+        Validate and persist several preferences values at once, in a single
+        transaction, with one query to fetch the existing database entries,
+        one to update them and one to create the missing ones.
+
+        :param values: a dictionary of preferences identifiers and values
+        :param force: if False, entries holding the same serialized value are skipped
+        :return: the list of written preference model instances
+        """
+        preferences = {}
+        for key, value in values.items():
+            section, name = self.parse_lookup(key)
+            preference = self.registry.get(section=section, name=name, fallback=False)
+            preference.validate(value)
+            preferences[preference] = value
+        return self.update_db_prefs(preferences, force=force)
+
+    def update_db_prefs(self, values, db_prefs=None, force=False):
+        """
+        Persist several preferences values at once, without validating them,
+        with one query to update the existing database entries and one to
+        create the missing ones, and a single cache write.
+
+        Missing entries that are created concurrently are updated instead.
+
+        :param values: a dictionary of preferences objects and values
+        :param db_prefs: the database entries of these preferences by identifier,
+            when they are already loaded. Otherwise, they are fetched in the
+            same transaction.
+        :param force: if False, entries holding the same serialized value are skipped
+        :return: the list of written preference model instances
+        """
+        updated, created, changes, new_prefs = [], [], [], {}
+        with transaction.atomic(using=router.db_for_write(self.model)):
+            if db_prefs is None:
+                identifiers = {p.identifier() for p in values}
+                db_prefs = {
+                    db_pref.preference.identifier(): self.bind(db_pref)
+                    for db_pref in self.queryset.filter(
+                        name__in={p.name for p in values}
+                    ).select_for_update()
+                    if db_pref.preference.identifier() in identifiers
+                }
+            for preference, value in values.items():
+                db_pref = db_prefs.get(preference.identifier())
+                if db_pref is None or db_pref.pk is None:
+                    new_prefs[preference.identifier()] = (
+                        preference,
+                        value,
+                        self.build_db_pref(
+                            preference.section.name, preference.name, value
+                        ),
+                    )
+                    continue
+                old_raw_value = db_pref.raw_value
+                db_pref.value = value
+                if db_pref.raw_value == old_raw_value and not force:
+                    continue
+                updated.append(db_pref)
+                old_value = preference.serializer.deserialize(old_raw_value)
+                changes.append(
+                    (preference.section.name, preference.name, old_value, value)
+                )
+
+            if updated:
+                self.model.objects.bulk_update(updated, ["raw_value"])
+            if new_prefs:
+                created, conflicts = self._create_new_prefs(new_prefs, changes, force)
+                if conflicts:
+                    self.model.objects.bulk_update(conflicts, ["raw_value"])
+
+        if updated or created:
+            self.refresh_cache(*updated, *created)
+        if changes:
+            send_preference_updated(
+                self.__class__, changes, using=router.db_for_write(self.model)
             )
-        except self.model.DoesNotExist:
-            return self.create_db_pref(section, name, value)
+        return updated + created
 
+    def _create_new_prefs(self, new_prefs, changes, force):
+        """
+        Insert the given ``(preference, value, unsaved entry)`` tuples by
+        identifier, and return the created entries along with those that
+        were created concurrently, and still need our value to be written.
+        Changes are added to the given list.
+        """
+        self.model.objects.bulk_create(
+            [new_pref for _, _, new_pref in new_prefs.values()], ignore_conflicts=True
+        )
+
+        # entries created concurrently were left untouched by the insert,
+        # so we fetch the actual rows back
+        created, conflicts = [], []
+        queryset = self.queryset.filter(
+            name__in={preference.name for preference, _, _ in new_prefs.values()}
+        ).select_for_update()
+        for db_pref in queryset:
+            try:
+                preference, value, new_pref = new_prefs[db_pref.preference.identifier()]
+            except KeyError:
+                continue
+            if db_pref.raw_value == new_pref.raw_value:
+                # the preference had its default value
+                old_raw_value = self.get_default_raw_value(preference)
+            else:
+                old_raw_value = db_pref.raw_value
+                db_pref.raw_value = new_pref.raw_value
+                conflicts.append(db_pref)
+            created.append(self.bind(db_pref))
+            if new_pref.raw_value == old_raw_value and not force:
+                continue
+            old_value = preference.serializer.deserialize(old_raw_value)
+            changes.append((preference.section.name, preference.name, old_value, value))
+        return created, conflicts
+
+    def build_db_pref(self, section, name, value):
+        """Return an unsaved preference model instance holding the given value"""
+        kwargs = {}
+        if self.instance:
+            kwargs["instance"] = self.instance
+        db_pref = self.model(section=section, name=name, **kwargs)
+        db_pref.value = value
         return db_pref
 
+    def get_default_raw_value(self, preference):
+        """Return the serialized default value of the given preference"""
+        return self.build_db_pref(
+            preference.section.name, preference.name, preference.get("default")
+        ).raw_value
+
     def create_db_pref(self, section, name, value):
+        # this is a just a shortcut to get the raw, serialized value
+        # so we can pass it to get_or_create
+        return self._create_db_pref(self.build_db_pref(section, name, value))
+
+    def _create_db_pref(self, new_pref):
+        """Persist an unsaved preference model instance, unless it exists"""
+        self.forget_prefetched(new_pref.section, new_pref.name)
         kwargs = {
-            "section": section,
-            "name": name,
+            "section": new_pref.section,
+            "name": new_pref.name,
         }
         if self.instance:
             kwargs["instance"] = self.instance
-
-        # this is a just a shortcut to get the raw, serialized value
-        # so we can pass it to get_or_create
-        m = self.model(**kwargs)
-        m.value = value
-        raw_value = m.raw_value
+        raw_value = new_pref.raw_value
 
         db_pref, created = self.model.objects.get_or_create(**kwargs)
         if created and db_pref.raw_value != raw_value:
@@ -200,6 +752,48 @@ class PreferencesManager(Mapping):
 
         return db_pref
 
+    def create_missing_db_prefs(self):
+        """
+        Ensure every registered preference has a database entry,
+        which is not the case with ENABLE_SPARSE_STORAGE
+        """
+        existing = set(self.queryset.values_list("section", "name"))
+        missing = [
+            p
+            for p in self.registry.preferences()
+            if (p.section.name, p.name) not in existing
+        ]
+        if missing:
+            self.refresh_cache(*self.create_db_prefs(missing))
+
+    def create_db_prefs(self, preferences):
+        """
+        Create the database entries of the given preferences, using their
+        default value, with a single insert query.
+
+        Entries created concurrently are left untouched.
+        Return the matching preference model instances, as stored in the
+        database.
+        """
+        new_prefs = [
+            self.build_db_pref(
+                preference.section.name, preference.name, preference.get("default")
+            )
+            for preference in preferences
+        ]
+
+        self.model.objects.bulk_create(new_prefs, ignore_conflicts=True)
+
+        # we can't get primary keys back from bulk_create when ignoring
+        # conflicts, and we don't want to cache defaults for entries another
+        # process created in the meantime, so we fetch the actual rows
+        identifiers = {p.identifier() for p in preferences}
+        return [
+            db_pref
+            for db_pref in self.queryset.filter(name__in={p.name for p in preferences})
+            if db_pref.preference.identifier() in identifiers
+        ]
+
     def all(self):
         """Return a dictionary containing all preferences by section
         Loaded from cache or from db in case of cold cache
@@ -208,41 +802,264 @@ class PreferencesManager(Mapping):
             return self.load_from_db()
 
         preferences = self.registry.preferences()
+        remembered = self.remembered
+        for store in (self.prefetched, remembered):
+            if store and len(store) == len(preferences):
+                return self.copy_values(store)
+        a = {}
+        missing = preferences
+        generation = None
+        if preferences_settings.ENABLE_LOCAL_CACHE:
+            generation = self.get_generation()
+            missing = []
+            for preference in preferences:
+                if not self.is_locally_cacheable(preference):
+                    missing.append(preference)
+                    continue
+                try:
+                    a[preference.identifier()] = self.from_local_cache(
+                        preference, generation
+                    )
+                except CachedValueNotFound:
+                    missing.append(preference)
+            if not missing:
+                return a
+
+        if preferences_settings.ENABLE_CACHE_SNAPSHOT:
+            # a single cache entry holds every value
+            try:
+                from_cache = self.from_snapshot(missing)
+            except CachedValueNotFound:
+                # the snapshot is dropped on write, while the values of
+                # written preferences are refreshed
+                from_cache = self.rebuild_snapshot(missing)
+        else:
+            # first we hit the cache once for all existing preferences
+            from_cache = self.many_from_cache(missing)
 
-        # first we hit the cache once for all existing preferences
-        a = self.many_from_cache(preferences)
-        if len(a) == len(preferences):
-            return a  # avoid database hit if not necessary
+        if len(from_cache) < len(missing):
+            # then we fill those that miss, but exist in the database
+            # (just hit the database for all of them, filtering is complicated,
+            # and in most cases you'd need to grab the majority of them anyway)
+            from_cache.update(self.load_from_db(cache=True))
 
-        # then we fill those that miss, but exist in the database
-        # (just hit the database for all of them, filtering is complicated, and
-        # in most cases you'd need to grab the majority of them anyway)
-        a.update(self.load_from_db(cache=True))
+        for preference in missing:
+            value = from_cache[preference.identifier()]
+            self.to_local_cache(preference, value, generation)
+            a[preference.identifier()] = value
+        if remembered is not None:
+            remembered.update(self.copy_values(a))
         return a
 
     def load_from_db(self, cache=False):
         """Return a dictionary of preferences by section directly from DB"""
-        a = {}
         db_prefs = {p.preference.identifier(): p for p in self.queryset}
-        cache_prefs = []
+        preferences = self.registry.preferences()
+
+        created = []
+        missing = [p for p in preferences if p.identifier() not in db_prefs]
+        if missing and not preferences_settings.ENABLE_SPARSE_STORAGE:
+            created = self.create_db_prefs(missing)
+            db_prefs.update({p.preference.identifier(): p for p in created})
+            missing = []
 
-        for preference in self.registry.preferences():
+        raw_values = []
+        for preference in preferences:
             try:
                 db_pref = db_prefs[preference.identifier()]
             except KeyError:
-                db_pref = self.create_db_pref(
-                    section=preference.section.name,
-                    name=preference.name,
-                    value=preference.get("default"),
+                # missing entries resolve to their default value, in memory only
+                db_pref = self.build_db_pref(
+                    preference.section.name, preference.name, preference.get("default")
                 )
-            else:
-                # cache if create_db_pref() hasn't already done so
-                if cache:
-                    cache_prefs.append(db_pref)
+            raw_values.append((preference.identifier(), preference, db_pref.raw_value))
+        a = self.deserialize_many(raw_values)
 
-            a[preference.identifier()] = db_pref.value
+        if cache:
+            self.to_cache(*db_prefs.values())
+            if missing:
+                self.to_cache_defaults(*missing)
+        elif created:
+            self.to_cache(*created)
+        if created:
+            self.bump_generation()
 
-        if cache_prefs:
-            self.to_cache(*cache_prefs)
+        if cache and preferences_settings.ENABLE_CACHE_SNAPSHOT:
+            self.to_snapshot(*db_prefs.values(), defaults=missing)
 
         return a
+
+
+def _unpickle_manager():
+    return None
+
+
+class PrefetchedValues(dict):
+    """
+    Preferences values stored on a model instance. They are only valid
+    for the lifetime of the instance and are not pickled.
+    """
+
+    def __reduce__(self):
+        return (PrefetchedValues, ())
+
+
+class BulkPreferencesManager(Mapping):
+    """
+    Load the preferences of many instances at once, with a single cache
+    lookup and, on cache misses, a single database query.
+
+    This is a mapping of each instance to a dictionary of its preferences
+    values, as returned by :py:meth:`PreferencesManager.all`.
+    """
+
+    def __init__(self, model, registry, instances, preferences=None):
+        self.model = model
+        self.registry = registry
+        self.instances = list(instances)
+        if preferences is None:
+            self.preferences = self.registry.preferences()
+        else:
+            self.preferences = [self.registry.get(p) for p in preferences]
+        self.managers = {
+            instance: self.registry.manager(instance=instance)
+            for instance in self.instances
+        }
+        self._values = None
+
+    @property
+    def cache(self):
+        from django.core.cache import caches
+
+        return caches[preferences_settings.CACHE_NAME]
+
+    @property
+    def values_by_instance(self):
+        if self._values is None:
+            self._values = self.load()
+        return self._values
+
+    def __getitem__(self, instance):
+        return self.values_by_instance[instance]
+
+    def __iter__(self):
+        return iter(self.values_by_instance)
+
+    def __len__(self):
+        return len(self.values_by_instance)
+
+    def load(self):
+        """Return a dictionary of preferences values for each instance"""
+        values = {instance: {} for instance in self.instances}
+        missing = set(self.instances)
+
+        if preferences_settings.ENABLE_CACHE:
+            keys = {
+                (instance, p): manager.get_cache_key(p.section.name, p.name)
+                for instance, manager in self.managers.items()
+                for p in self.preferences
+            }
+            cached = self.cache.get_many(list(keys.values()))
+            raw_values = [
+                ((instance, preference.identifier()), preference, cached[key])
+                for (instance, preference), key in keys.items()
+                if key in cached
+            ]
+            deserialized = self.registry.manager().deserialize_many(raw_values)
+            for (instance, identifier), value in deserialized.items():
+                values[instance][identifier] = value
+            missing = {
+                instance
+                for instance, v in values.items()
+                if len(v) < len(self.preferences)
+            }
+
+        if missing:
+            for instance, v in self.load_from_db(missing).items():
+                values[instance].update(v)
+
+        return values
+
+    def load_from_db(self, instances):
+        """
+        Return a dictionary of preferences values for each of the given
+        instances, directly from DB. Missing entries are created in bulk.
+        """
+        instances = {instance.pk: instance for instance in instances}
+        identifiers = {p.identifier() for p in self.preferences}
+        db_prefs = {pk: {} for pk in instances}
+
+        def fetch(queryset):
+            for db_pref in queryset:
+                identifier = db_pref.preference.identifier()
+                if identifier in identifiers:
+                    db_prefs[db_pref.instance_id][identifier] = db_pref
+
+        fetch(
+            self.model.objects.filter(
+                instance__in=list(instances),
+                name__in={p.name for p in self.preferences},
+            )
+        )
+
+        defaults = {}
+        new_prefs = []
+        for pk, instance in instances.items():
+            manager = self.managers[instance]
+            for preference in self.preferences:
+                if preference.identifier() in db_prefs[pk]:
+                    continue
+                if preferences_settings.ENABLE_SPARSE_STORAGE:
+                    defaults.setdefault(instance, []).append(preference)
+                else:
+                    new_prefs.append(
+                        manager.build_db_pref(
+                            preference.section.name,
+                            preference.name,
+                            preference.get("default"),
+                        )
+                    )
+
+        if new_prefs:
+            # entries created concurrently are left untouched, so we fetch
+            # the actual rows back instead of trusting our defaults
+            self.model.objects.bulk_create(new_prefs, ignore_conflicts=True)
+            fetch(
+                self.model.objects.filter(
+                    instance__in={p.instance_id for p in new_prefs},
+                    name__in={p.name for p in new_prefs},
+                )
+            )
+
+        raw_values = []
+        update_dict = {}
+        for pk, instance in instances.items():
+            manager = self.managers[instance]
+            for identifier, db_pref in db_prefs[pk].items():
+                raw_values.append(
+                    ((instance, identifier), db_pref.preference, db_pref.raw_value)
+                )
+            for preference in defaults.get(instance, []):
+                # missing entries resolve to their default value, in memory only
+                raw_values.append(
+                    (
+                        (instance, preference.identifier()),
+                        preference,
+                        preferences_settings.CACHE_DEFAULT_VALUE,
+                    )
+                )
+                key = manager.get_cache_key(preference.section.name, preference.name)
+                update_dict[key] = preferences_settings.CACHE_DEFAULT_VALUE
+            for db_pref in db_prefs[pk].values():
+                key = manager.get_cache_key(db_pref.section, db_pref.name)
+                update_dict[key] = manager.get_cache_value(db_pref)
+
+        values = {instance: {} for instance in instances.values()}
+        deserialized = self.registry.manager().deserialize_many(raw_values)
+        for (instance, identifier), value in deserialized.items():
+            values[instance][identifier] = value
+
+        if preferences_settings.ENABLE_CACHE:
+            self.cache.set_many(update_dict)
+
+        return values
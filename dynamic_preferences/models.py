@@ -10,10 +10,27 @@ from django.utils.translation import gettext_lazy as _
 from dynamic_preferences.registries import (
     preference_models,
     global_preferences_registry,
+    prefetch_preferences,
 )
 from .utils import update
 
 
+class PreferenceModelQuerySet(QuerySet):
+    def invalidate_cache(self):
+        """
+        Refresh the cached values of the preferences in this queryset.
+        ``update()`` and ``bulk_update()`` do not send any signal, so
+        call this once they are done:
+
+        .. code-block:: python
+
+            queryset = GlobalPreferenceModel.objects.filter(section='blog')
+            queryset.update(raw_value='')
+            queryset.invalidate_cache()
+        """
+        refresh_preferences_cache(self)
+
+
 class BasePreferenceModel(models.Model):
 
     """
@@ -36,6 +53,8 @@ class BasePreferenceModel(models.Model):
     #: a value, serialized to a string. This field should not be accessed directly, use :py:attr:`BasePreferenceModel.value` instead
     raw_value = models.TextField(_("Raw Value"), null=True, blank=True)
 
+    objects = PreferenceModelQuerySet.as_manager()
+
     class Meta:
         abstract = True
         app_label = "dynamic_preferences"
@@ -114,22 +133,88 @@ class PerInstancePreferenceModel(BasePreferenceModel):
 
 global_preferences_registry.preference_model = GlobalPreferenceModel
 
-# Create default preferences for new instances
 
-from django.db.models.signals import post_save
+class PreferencesQuerySet(QuerySet):
+    """
+    A queryset for models bound to per-instance preferences, that can
+    prefetch those preferences. Use it as the manager of your model:
 
+    .. code-block:: python
 
-def invalidate_cache(sender, created, instance, **kwargs):
-    if not isinstance(instance, BasePreferenceModel):
-        return
-    registry = preference_models.get_by_preference(instance)
-    linked_instance = getattr(instance, "instance", None)
+        class Site(models.Model):
+            objects = PreferencesQuerySet.as_manager()
+
+        for site in Site.objects.prefetch_preferences('access__is_public'):
+            # no additional query here
+            site.preferences['access__is_public']
+    """
+
+    def __init__(self, *args, **kwargs):
+        super(PreferencesQuerySet, self).__init__(*args, **kwargs)
+        self._preferences_lookups = None
+        self._preferences_done = False
+
+    def prefetch_preferences(self, *preferences):
+        """
+        Prefetch the given preferences identifiers, or all preferences
+        if none is given, when the queryset is evaluated
+        """
+        clone = self._chain()
+        clone._preferences_lookups = preferences
+        return clone
+
+    def _clone(self):
+        clone = super(PreferencesQuerySet, self)._clone()
+        clone._preferences_lookups = self._preferences_lookups
+        return clone
+
+    def _fetch_all(self):
+        super(PreferencesQuerySet, self)._fetch_all()
+        if self._preferences_lookups is not None and not self._preferences_done:
+            self._preferences_done = True
+            prefetch_preferences(
+                [o for o in self._result_cache if isinstance(o, models.Model)],
+                *self._preferences_lookups
+            )
+
+
+def get_preference_manager(db_pref):
+    """
+    Return the manager of the registry and instance the given
+    preference model instance belongs to
+    """
+    registry = preference_models.get_by_preference(db_pref)
     kwargs = {}
-    if linked_instance:
-        kwargs["instance"] = linked_instance
+    instance_id = getattr(db_pref, "instance_id", None)
+    if instance_id is not None:
+        # we avoid fetching the instance, only its primary key is needed
+        field = db_pref._meta.get_field("instance")
+        kwargs["instance"] = field.get_cached_value(db_pref, None) or (
+            field.remote_field.model(pk=instance_id)
+        )
+    return registry.manager(**kwargs)
+
+
+def refresh_preferences_cache(db_prefs):
+    """
+    Refresh the cached values of the given preference model instances,
+    with a single cache write per registry and instance
+    """
+    groups = {}
+    for db_pref in db_prefs:
+        key = (db_pref.__class__, getattr(db_pref, "instance_id", None))
+        groups.setdefault(key, []).append(db_pref)
+    for db_prefs in groups.values():
+        get_preference_manager(db_prefs[0]).refresh_cache(*db_prefs)
+
 
-    manager = registry.manager(**kwargs)
-    manager.to_cache(instance)
+# Those receivers are connected to each registered preference model,
+# see PreferenceModelsRegistry.register
+
+
+def invalidate_cache(sender, created, instance, **kwargs):
+    get_preference_manager(instance).refresh_cache(instance)
 
 
-post_save.connect(invalidate_cache)
+def forget_cache(sender, instance, **kwargs):
+    get_preference_manager(instance).forget_cache(instance)
@@ -97,8 +97,17 @@ class AbstractPreference(object):
         Return the name and the section of the Preference joined with a separator, with the form `section<separator>name`
         """
 
+        # the identifier is memoized along with the separator it was built with
+        separator = preferences_settings.SECTION_KEY_SEPARATOR
+        try:
+            if self._identifier[0] == separator:
+                return self._identifier[1]
+        except AttributeError:
+            pass
+
         if not self.section or not self.section.name:
-            return self.name
-        return preferences_settings.SECTION_KEY_SEPARATOR.join(
-            [self.section.name, self.name]
-        )
+            identifier = self.name
+        else:
+            identifier = separator.join([self.section.name, self.name])
+        self._identifier = (separator, identifier)
+        return identifier
@@ -1,5 +1,6 @@
 from django.core.exceptions import FieldDoesNotExist
 from django.apps import apps
+from django.db.models.signals import class_prepared, post_delete, post_save
 
 # import the logging library
 import warnings
@@ -13,9 +14,15 @@ logger = logging.getLogger(__name__)
 
 #: The package where autodiscover will try to find preferences to register
 
-from .managers import PreferencesManager
+from .managers import (
+    MANAGER_CACHE_ATTRIBUTE,
+    PREFETCHED_PREFERENCES_ATTRIBUTE,
+    BulkPreferencesManager,
+    PreferencesManager,
+    PrefetchedValues,
+)
 from .settings import preferences_settings
-from .exceptions import NotFoundInRegistry
+from .exceptions import NotFoundInRegistry, RegistryFrozen
 from .types import StringPreference
 from .preferences import EMPTY_SECTION, Section
 
@@ -35,19 +42,66 @@ class PreferenceModelsRegistry(persisting_theory.Registry):
 
     look_into = preferences_settings.REGISTRY_MODULE
 
+    #: once true, preference registries are frozen when registered, see :py:meth:`freeze`
+    frozen = False
+
     def register(self, preference_model, preference_registry):
         self[preference_model] = preference_registry
         preference_registry.preference_model = preference_model
         if not hasattr(preference_model, "registry"):
             setattr(preference_model, "registry", preference_registry)
         self.attach_manager(preference_model, preference_registry)
+        self.connect_signals(preference_model)
+        if self.frozen:
+            preference_registry.freeze()
+
+    def connect_signals(self, model):
+        """
+        Keep the cache up to date when preferences of the model, or of its
+        proxies, are saved or deleted
+        """
+        # models import this module, so we can't import them at the top level
+        from .models import forget_cache, invalidate_cache
+
+        senders = [model]
+        if apps.models_ready:
+            # proxies defined later are connected by connect_proxy_signals
+            senders += [
+                m
+                for m in apps.get_models()
+                if m._meta.proxy and m._meta.concrete_model is model
+            ]
+        for sender in senders:
+            post_save.connect(invalidate_cache, sender=sender)
+            post_delete.connect(forget_cache, sender=sender)
+
+    def freeze(self):
+        """
+        Freeze all registered preference registries, and those registered later
+        (apps may register their models after preferences are autodiscovered)
+        """
+        self.frozen = True
+        for registry in self.values():
+            registry.freeze()
 
     def attach_manager(self, model, registry):
         if not hasattr(model, "instance"):
             return
 
         def instance_getter(self):
-            return registry.manager(instance=self)
+            # the manager is built once per model instance, and keeps the
+            # values it reads until the end of the request
+            manager = self.__dict__.get(MANAGER_CACHE_ATTRIBUTE)
+            if manager is None:
+                manager = registry.manager(
+                    instance=self,
+                    prefetched=self.__dict__.setdefault(
+                        PREFETCHED_PREFERENCES_ATTRIBUTE, PrefetchedValues()
+                    ),
+                    remember_values=True,
+                )
+                self.__dict__[MANAGER_CACHE_ATTRIBUTE] = manager
+            return manager
 
         getter = property(instance_getter)
         instance_class = model._meta.get_field("instance").remote_field.model
@@ -78,6 +132,43 @@ class PreferenceModelsRegistry(persisting_theory.Registry):
 preference_models = PreferenceModelsRegistry()
 
 
+def connect_proxy_signals(sender, **kwargs):
+    """Connect proxies of preference models defined after their registration"""
+    if sender._meta.proxy and sender._meta.concrete_model in preference_models:
+        preference_models.connect_signals(sender)
+
+
+class_prepared.connect(connect_proxy_signals)
+
+
+def prefetch_preferences(instances, *preferences, registry=None):
+    """
+    Load the preferences of the given model instances in bulk, so
+    that reading them later through the instances manager, e.g.
+    ``user.preferences['section__name']``, does not hit the cache or the database.
+
+    This is the preferences equivalent of ``prefetch_related_objects``.
+
+    :param instances: a list of model instances bound to the same registry
+    :param preferences: the identifiers of the preferences to prefetch.
+        If omitted, all registered preferences are prefetched
+    :param registry: the preferences registry, guessed from the first instance
+        if omitted
+    """
+    instances = list(instances)
+    if not instances:
+        return instances
+    if registry is None:
+        registry = preference_models.get_by_instance(instances[0])
+
+    values = registry.bulk_manager(instances, preferences=preferences or None)
+    for instance in instances:
+        instance.__dict__.setdefault(
+            PREFETCHED_PREFERENCES_ATTRIBUTE, PrefetchedValues()
+        ).update(values[instance])
+    return instances
+
+
 class PreferenceRegistry(persisting_theory.Registry):
 
     """
@@ -101,9 +192,23 @@ class PreferenceRegistry(persisting_theory.Registry):
     #: used to reverse urls for sections in form views/templates
     section_url_namespace = None
 
+    #: a frozen registry does not accept new preferences, see :py:meth:`freeze`
+    frozen = False
+
     def __init__(self, *args, **kwargs):
         super(PreferenceRegistry, self).__init__(*args, **kwargs)
         self.section_objects = collections.OrderedDict()
+        #: preferences indexed by name only, see :py:meth:`get_by_name`
+        self.names = {}
+        self._invalidate()
+
+    def _invalidate(self):
+        """Forget the lookup tables computed from registered preferences"""
+        self._preferences = None
+        self._section_preferences = {}
+        self._identifiers = None
+        self._cache_key_suffixes = None
+        self._cache_keys = {}
 
     def register(self, preference_class):
         """
@@ -111,6 +216,12 @@ class PreferenceRegistry(persisting_theory.Registry):
 
         :param preference_class: a :py:class:`prefs.Preference` subclass
         """
+        if self.frozen:
+            raise RegistryFrozen(
+                "Cannot register {0} in frozen {1}".format(
+                    preference_class.__name__, self.__class__.__name__
+                )
+            )
         preference = preference_class(registry=self)
         self.section_objects[preference.section.name] = preference.section
 
@@ -121,8 +232,46 @@ class PreferenceRegistry(persisting_theory.Registry):
             self[preference.section.name] = collections.OrderedDict()
             self[preference.section.name][preference.name] = preference
 
+        self._index_name(preference)
+        self._invalidate()
         return preference_class
 
+    def freeze(self):
+        """
+        Compile the lookup tables of registered preferences, so that reading
+        values does not need to build them, and refuse further registrations.
+        This is done after autodiscovery when the ``FREEZE_REGISTRIES`` setting is on.
+        """
+        for section in self:
+            self.preferences(section=section)
+        self.preferences_by_identifier()
+        self.cache_key_suffixes()
+        self.frozen = True
+
+    def _index_name(self, preference):
+        """
+        Update the name index used by :py:meth:`get_by_name`. When several
+        sections hold a preference with the same name, the one from
+        the first registered section is returned.
+        """
+        existing = self.names.get(preference.name)
+        if existing is not None and existing.section.name != preference.section.name:
+            warnings.warn(
+                'Preference name "{}" is registered in both "{}" and "{}" sections '
+                "of {}, get_by_name() will only return one of them".format(
+                    preference.name,
+                    existing.section.name,
+                    preference.section.name,
+                    self.__class__.__name__,
+                )
+            )
+            sections = list(self.keys())
+            if sections.index(existing.section.name) < sections.index(
+                preference.section.name
+            ):
+                return
+        self.names[preference.name] = preference
+
     def _fallback(self, section_name, pref_name):
         """
         Create a fallback preference object,
@@ -159,6 +308,12 @@ class PreferenceRegistry(persisting_theory.Registry):
         :type name: bool.
         :return: a :py:class:`prefs.BasePreference` instance
         """
+        if section is None:
+            try:
+                return self.preferences_by_identifier()[name]
+            except KeyError:
+                pass
+
         # try dotted notation
         try:
             _section, name = name.split(preferences_settings.SECTION_KEY_SEPARATOR)
@@ -182,10 +337,10 @@ class PreferenceRegistry(persisting_theory.Registry):
 
     def get_by_name(self, name):
         """Get a preference by name only (no section)"""
-        for section in self.values():
-            for preference in section.values():
-                if preference.name == name:
-                    return preference
+        try:
+            return self.names[name]
+        except KeyError:
+            pass
         raise NotFoundInRegistry(
             "No such preference in {0} with name={1}".format(
                 self.__class__.__name__, name
@@ -206,22 +361,79 @@ class PreferenceRegistry(persisting_theory.Registry):
 
     def preferences(self, section=None):
         """
-        Return a list of all registered preferences
-        or a list of preferences registered for a given section
+        Return a tuple of all registered preferences
+        or a tuple of preferences registered for a given section.
+        The result is computed once, until another preference is registered.
 
         :param section: The section name under which the preference is registered
         :type section: str.
-        :return: a list of :py:class:`prefs.BasePreference` instances
+        :return: a tuple of :py:class:`prefs.BasePreference` instances
         """
-
         if section is None:
-            return [self[section][name] for section in self for name in self[section]]
-        else:
-            return [self[section][name] for name in self[section]]
+            if self._preferences is None:
+                self._preferences = tuple(
+                    self[section][name] for section in self for name in self[section]
+                )
+            return self._preferences
+
+        try:
+            return self._section_preferences[section]
+        except KeyError:
+            preferences = tuple(self[section].values())
+            self._section_preferences[section] = preferences
+            return preferences
+
+    def cache_key_suffixes(self):
+        """
+        :return: the end of the cache key of each registered preference,
+            keyed by section and preference name
+        :rtype: dict
+        """
+        if self._cache_key_suffixes is None:
+            self._cache_key_suffixes = {
+                (p.section.name, p.name): "_{0}_{1}".format(p.section.name, p.name)
+                for p in self.preferences()
+            }
+        return self._cache_key_suffixes
+
+    def cache_keys(self, prefix):
+        """
+        :return: a dictionary shared by managers using the given cache key prefix,
+            to store the complete cache key of each preference
+        :rtype: dict
+        """
+        return self._cache_keys.setdefault(prefix, {})
+
+    def preferences_by_identifier(self):
+        """
+        :return: a dictionary of all registered preferences, keyed by identifier
+        :rtype: dict
+        """
+        separator = preferences_settings.SECTION_KEY_SEPARATOR
+        if self._identifiers is None or self._identifiers[0] != separator:
+            self._identifiers = (
+                separator,
+                {p.identifier(): p for p in self.preferences()},
+            )
+        return self._identifiers[1]
 
 
 class PerInstancePreferenceRegistry(PreferenceRegistry):
-    pass
+    def bulk_manager(self, instances, preferences=None):
+        """
+        Return a mapping of the given instances to their preferences values,
+        loaded with a single cache lookup and a single database query
+
+        :param instances: an iterable of model instances
+        :param preferences: an optional list of preferences identifiers,
+            to only load a subset of the registered preferences
+        """
+        return BulkPreferencesManager(
+            registry=self,
+            model=self.preference_model,
+            instances=instances,
+            preferences=preferences,
+        )
 
 
 class GlobalPreferenceRegistry(PreferenceRegistry):
@@ -1,4 +1,5 @@
 import decimal
+import functools
 import os
 
 from datetime import date, timedelta, datetime, time, timezone
@@ -21,6 +22,8 @@ from django.utils.timezone import (
 )
 from django.db.models.fields.files import FieldFile
 
+from .settings import preferences_settings
+
 
 class UnsetValue(object):
     pass
@@ -33,6 +36,11 @@ class SerializationError(Exception):
     pass
 
 
+@functools.lru_cache(maxsize=1024)
+def memoized_to_python(serializer, value):
+    return serializer.to_python(value)
+
+
 class BaseSerializer:
     """
     A serializer take a Python variable and returns a string that can be stored safely in database
@@ -40,6 +48,10 @@ class BaseSerializer:
 
     exception = SerializationError
 
+    #: if True, the values deserialized from the same string are reused,
+    #: see :py:meth:`copy_value` for serializers that return mutable values
+    memoize = False
+
     @classmethod
     def serialize(cls, value, **kwargs):
         """
@@ -52,8 +64,15 @@ class BaseSerializer:
         """
         Convert a python string to a var
         """
+        if cls.memoize and not kwargs and isinstance(value, str):
+            return cls.copy_value(memoized_to_python(cls, value))
         return cls.to_python(value, **kwargs)
 
+    @classmethod
+    def copy_value(cls, value):
+        """Return a copy of a memoized value, that can be changed safely"""
+        return value
+
     @classmethod
     def to_python(cls, value, **kwargs):
         raise NotImplementedError
@@ -150,6 +169,8 @@ IntSerializer = IntegerSerializer
 
 
 class DecimalSerializer(BaseSerializer):
+    memoize = True
+
     @classmethod
     def clean_to_db_value(cls, value):
         if not isinstance(value, decimal.Decimal):
@@ -220,8 +241,27 @@ class StringSerializer(BaseSerializer):
 class ModelSerializer(InstanciatedSerializer):
     model = None
 
-    def __init__(self, model):
+    def __init__(self, model, cache_instance=False):
         self.model = model
+        #: if True, deserialized instances are stored in the preferences cache,
+        #: see :py:meth:`invalidate`
+        self.cache_instance = cache_instance
+
+    @property
+    def cache(self):
+        from django.core.cache import caches
+
+        return caches[preferences_settings.CACHE_NAME]
+
+    def get_cache_key(self, pk):
+        return "dynamic_preferences_instance_{0}_{1}".format(
+            self.model._meta.label_lower, pk
+        )
+
+    def invalidate(self, pk):
+        """Remove the cached model instance with the given primary key"""
+        if self.cache_instance:
+            self.cache.delete(self.get_cache_key(pk))
 
     def to_db(self, value, **kwargs):
         if not value or (value == UNSET):
@@ -233,19 +273,122 @@ class ModelSerializer(InstanciatedSerializer):
             return
         try:
             pk = int(value)
-            return self.model.objects.get(pk=pk)
         except:
             raise self.exception("Value {0} cannot be converted to pk".format(value))
 
+        if self.cache_instance:
+            instance = self.cache.get(self.get_cache_key(pk))
+            if instance is not None:
+                return instance
+        try:
+            instance = self.model.objects.get(pk=pk)
+        except:
+            raise self.exception("Value {0} cannot be converted to pk".format(value))
+        if self.cache_instance:
+            self.cache.set(self.get_cache_key(pk), instance)
+        return instance
+
+    def to_python_many(self, values):
+        """
+        Deserialize several values at once, fetching the model instances
+        with a single query
+        """
+        pks = []
+        for value in values:
+            try:
+                pks.append(None if value is None else int(value))
+            except:
+                raise self.exception(
+                    "Value {0} cannot be converted to pk".format(value)
+                )
+
+        wanted = {pk for pk in pks if pk is not None}
+        instances = {}
+        if self.cache_instance and wanted:
+            keys = {self.get_cache_key(pk): pk for pk in wanted}
+            instances = {
+                keys[key]: instance
+                for key, instance in self.cache.get_many(list(keys)).items()
+            }
+        fetched = {}
+        if wanted.difference(instances):
+            fetched = self.model.objects.in_bulk(wanted.difference(instances))
+        if self.cache_instance and fetched:
+            self.cache.set_many(
+                {self.get_cache_key(pk): instance for pk, instance in fetched.items()}
+            )
+        instances.update(fetched)
+
+        try:
+            return [None if pk is None else instances[pk] for pk in pks]
+        except KeyError as e:
+            raise self.exception(
+                "Value {0} cannot be converted to pk".format(e.args[0])
+            )
+
+
+class ModelMultipleValue(object):
+    """
+    The value of a model multiple choice preference, as a list of primary keys.
+    It behaves like a queryset of the corresponding instances, which is only
+    built when needed: ``pks``, ``len()`` and ``in`` do not query the database.
+    """
+
+    def __init__(self, model, pks):
+        self.model = model
+        self.pks = pks
+        self._queryset = None
+        self._pk_set = None
+
+    @property
+    def queryset(self):
+        if self._queryset is None:
+            self._queryset = self.model.objects.filter(pk__in=self.pks)
+        return self._queryset
+
+    def __getattr__(self, attr):
+        if attr.startswith("_") or attr in ("model", "pks"):
+            raise AttributeError(attr)
+        return getattr(self.queryset, attr)
+
+    def __iter__(self):
+        return iter(self.queryset)
+
+    def __getitem__(self, k):
+        return self.queryset[k]
+
+    def __len__(self):
+        return len(self.pks)
+
+    def __bool__(self):
+        return bool(self.pks)
+
+    def __contains__(self, item):
+        if self._pk_set is None:
+            self._pk_set = set(self.pks)
+        return getattr(item, "pk", item) in self._pk_set
+
+    def __repr__(self):
+        return "<{0}: {1} {2}>".format(
+            self.__class__.__name__, self.model.__name__, self.pks
+        )
+
 
 class ModelMultipleSerializer(ModelSerializer):
     separator = ","
     sort = True
 
+    def __init__(self, model, cache_instance=False, lazy_value=False):
+        super(ModelMultipleSerializer, self).__init__(model, cache_instance)
+        #: if True, values are returned as :py:class:`ModelMultipleValue`
+        self.lazy_value = lazy_value
+
     def to_db(self, value, **kwargs):
         if not value:
             return
-        if hasattr(value, "pk"):
+        if isinstance(value, ModelMultipleValue):
+            value = list(value.pks)
+        elif hasattr(value, "pk"):
             # Support single instances in this serializer to allow
             # create_deletion_handler to work for model multiple choice preferences
             value = [value.pk]
@@ -261,13 +404,21 @@ class ModelMultipleSerializer(ModelSerializer):
 
         return self.separator.join(map(str, value))
 
+    def to_python_many(self, values):
+        # querysets are lazy, there is nothing to fetch
+        return [self.to_python(value) for value in values]
+
     def to_python(self, value, **kwargs):
         if value in EMPTY_VALUES:
+            if self.lazy_value:
+                return ModelMultipleValue(self.model, [])
             return self.model.objects.none()
 
         try:
             pks = value.split(",")
             pks = [int(i) if str(i).isdigit() else str(i) for i in pks]
+            if self.lazy_value:
+                return ModelMultipleValue(self.model, pks)
             return self.model.objects.filter(pk__in=pks)
         except:
             raise self.exception("Array {0} cannot be converted to int".format(value))
@@ -347,6 +498,8 @@ class FileSerializer(InstanciatedSerializer):
 
 
 class DurationSerializer(BaseSerializer):
+    memoize = True
+
     @classmethod
     def to_db(cls, value, **kwargs):
         if not isinstance(value, timedelta):
@@ -367,6 +520,8 @@ class DurationSerializer(BaseSerializer):
 
 
 class DateSerializer(BaseSerializer):
+    memoize = True
+
     @classmethod
     def to_db(cls, value, **kwargs):
         if not isinstance(value, date):
@@ -388,6 +543,8 @@ class DateSerializer(BaseSerializer):
 
 
 class DateTimeSerializer(BaseSerializer):
+    memoize = True
+
     @classmethod
     def to_db(cls, value, **kwargs):
         if not isinstance(value, datetime):
@@ -428,6 +585,8 @@ class DateTimeSerializer(BaseSerializer):
 
 
 class TimeSerializer(BaseSerializer):
+    memoize = True
+
     @classmethod
     def to_db(cls, value, **kwargs):
         if not isinstance(value, time):
@@ -451,6 +610,11 @@ class TimeSerializer(BaseSerializer):
 class MultipleSerializer(BaseSerializer):
     separator = ","
     sort = True
+    memoize = True
+
+    @classmethod
+    def copy_value(cls, value):
+        return list(value)
 
     @classmethod
     def to_db(cls, value, **kwargs):
@@ -474,10 +638,13 @@ class MultipleSerializer(BaseSerializer):
         if value in EMPTY_VALUES:
             return []
 
-        ret = value.split(cls.separator)
-        # Duplication of separator is reverted (cf. to_db)
-        while "" in ret:
-            pos = ret.index("")
-            val = ret[pos - 1] + cls.separator + ret[pos + 1]
-            ret = ret[0: pos - 1] + [val] + ret[pos + 2:]
+        ret = []
+        tokens = iter(value.split(cls.separator))
+        for token in tokens:
+            if token == "" and ret:
+                # Duplication of separator is reverted (cf. to_db): an empty
+                # token joins the previous value with the next token
+                ret[-1] += cls.separator + next(tokens, "")
+            else:
+                ret.append(token)
         return ret
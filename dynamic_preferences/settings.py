@@ -3,6 +3,7 @@
 # Copyright (c) 2011-2015, Tom Christie All rights reserved.
 
 from django.conf import settings
+from django.core.signals import setting_changed
 
 SETTINGS_ATTR = "DYNAMIC_PREFERENCES"
 USER_SETTINGS = None
@@ -27,6 +28,24 @@ DEFAULTS = {
     # this will be used to cache empty values, since some cache backends
     # does not support it on get_many
     "CACHE_NONE_VALUE": "__dynamic_preferences_empty_value",
+    # only store preferences in database when their value is set, missing entries
+    # resolve to the preference default value
+    "ENABLE_SPARSE_STORAGE": False,
+    # this will be cached for preferences without database entry, see above
+    "CACHE_DEFAULT_VALUE": "__dynamic_preferences_default_value",
+    # cache the raw values of all preferences of a registry/instance in a single key
+    "ENABLE_CACHE_SNAPSHOT": False,
+    # keep deserialized values in a per-process cache, in front of CACHE_NAME
+    "ENABLE_LOCAL_CACHE": False,
+    "LOCAL_CACHE_MAX_SIZE": 1000,
+    # in seconds, None means values are kept until evicted or invalidated
+    "LOCAL_CACHE_TIMEOUT": 60,
+    # compile registries lookup tables after autodiscovery, and forbid later registrations
+    "FREEZE_REGISTRIES": False,
+    # send preference update signals once per transaction, on commit
+    "COALESCE_UPDATE_SIGNALS": False,
+    # if set, coalesced update signals are sent from a pool of this many threads
+    "UPDATE_SIGNALS_THREAD_POOL_SIZE": 0,
 }
 
 
@@ -40,6 +59,9 @@ class PreferenceSettings(object):
 
     Any setting with string import paths will be automatically resolved
     and return the class, rather than the string literal.
+
+    All settings are loaded at once on first access, and reloaded when
+    django settings are changed, e.g. with ``override_settings`` in tests.
     """
 
     def __init__(self, defaults=None):
@@ -50,21 +72,37 @@ class PreferenceSettings(object):
         return getattr(settings, SETTINGS_ATTR, {})
 
     def __getattr__(self, attr):
+        # only called for settings that are not loaded yet
         if attr not in self.defaults.keys():
             raise AttributeError("Invalid preference setting: '%s'" % attr)
 
-        try:
-            # Check if present in user settings
-            val = self.user_settings[attr]
-        except KeyError:
-            # Fall back to defaults
-            val = self.defaults[attr]
+        # We sometimes need to bypass the cache, like in tests
+        if not getattr(settings, "CACHE_DYNAMIC_PREFERENCES_SETTINGS", True):
+            return self.user_settings.get(attr, self.defaults[attr])
+
+        self.reload()
+        return self.__dict__[attr]
 
-        # Cache the result
-        # We sometimes need to bypass that, like in tests
-        if getattr(settings, "CACHE_DYNAMIC_PREFERENCES_SETTINGS", True):
-            setattr(self, attr, val)
-        return val
+    def reload(self):
+        """Load every setting from django settings, falling back to defaults"""
+        # loaded settings are stored as instance attributes, so reading them
+        # does not go through __getattr__
+        for attr in self.defaults:
+            self.__dict__.pop(attr, None)
+        if not getattr(settings, "CACHE_DYNAMIC_PREFERENCES_SETTINGS", True):
+            return
+
+        user_settings = self.user_settings
+        for attr, default in self.defaults.items():
+            self.__dict__[attr] = user_settings.get(attr, default)
 
 
 preferences_settings = PreferenceSettings(DEFAULTS)
+
+
+def reload_preferences_settings(setting, **kwargs):
+    if setting in (SETTINGS_ATTR, "CACHE_DYNAMIC_PREFERENCES_SETTINGS"):
+        preferences_settings.reload()
+
+
+setting_changed.connect(reload_preferences_settings)
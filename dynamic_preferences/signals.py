@@ -1,4 +1,200 @@
+import logging
+import threading
+import weakref
+
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import close_old_connections, transaction
 from django.dispatch import Signal
 
+from .settings import preferences_settings
+
+logger = logging.getLogger(__name__)
+
 # Arguments provided to listeners: "section", "name", "old_value" and "new_value"
 preference_updated = Signal()
+
+# Sent once per sender when a transaction is committed, if COALESCE_UPDATE_SIGNALS
+# is enabled. Arguments provided to listeners: "changes", a dictionary of
+# preferences identifiers to dictionaries with the "section", "name", "old_value"
+# and "new_value" keys
+preferences_updated = Signal()
+
+
+def has_update_listeners(sender):
+    """Return True if the previous value of updated preferences is needed"""
+    if preference_updated.has_listeners(sender):
+        return True
+    return (
+        preferences_settings.COALESCE_UPDATE_SIGNALS
+        and preferences_updated.has_listeners(sender)
+    )
+
+
+def send_preference_updated(sender, changes, using=None):
+    """
+    Notify receivers that preferences were updated, right away or once
+    the current transaction is committed, see :py:class:`UpdatesDispatcher`
+
+    :param changes: a list of ``(section, name, old_value, new_value)`` tuples
+    """
+    if not preferences_settings.COALESCE_UPDATE_SIGNALS:
+        for section, name, old_value, new_value in changes:
+            preference_updated.send(
+                sender=sender,
+                section=section,
+                name=name,
+                old_value=old_value,
+                new_value=new_value,
+            )
+        return
+    updates_dispatcher.add(sender, changes, using=using)
+
+
+class PendingUpdates(object):
+    """The preferences updated during an atomic block, by sender and identifier"""
+
+    def __init__(self, dispatcher, using=None):
+        self.dispatcher = dispatcher
+        self.using = using
+        self.changes = {}
+        self.sent = False
+
+    def add(self, sender, section, name, old_value, new_value):
+        if section:
+            identifier = preferences_settings.SECTION_KEY_SEPARATOR.join([section, name])
+        else:
+            identifier = name
+        changes = self.changes.setdefault(sender, {})
+        if identifier in changes:
+            # the preference was updated several times, receivers get the
+            # value it had before the transaction
+            old_value = changes[identifier]["old_value"]
+        changes[identifier] = {
+            "section": section,
+            "name": name,
+            "old_value": old_value,
+            "new_value": new_value,
+        }
+
+    def merge(self, other):
+        """Add the updates of an atomic block that was entered after ours"""
+        for sender, changes in other.changes.items():
+            for change in changes.values():
+                self.add(
+                    sender,
+                    change["section"],
+                    change["name"],
+                    change["old_value"],
+                    change["new_value"],
+                )
+        other.sent = True
+
+    def send(self):
+        if self.sent:
+            return
+        # the updates of other atomic blocks that were not rolled back are
+        # still waiting for the commit, they are sent along with ours
+        for pending in self.dispatcher.get_pending(self.using):
+            if pending is not self and not pending.sent:
+                self.merge(pending)
+        self.sent = True
+        self.dispatcher.deliver(self.changes)
+
+
+class UpdatesDispatcher(object):
+    """
+    Collect the preferences updated during a transaction, and send
+    :py:data:`preferences_updated` once per sender on commit, followed by
+    :py:data:`preference_updated` for each updated preference.
+
+    Updates are collected per atomic block, and sent by a commit callback
+    registered in that block, so those made in a savepoint that is rolled
+    back are discarded along with it.
+
+    Receivers are called in a thread pool if the
+    ``UPDATE_SIGNALS_THREAD_POOL_SIZE`` setting is set.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._executor = None
+
+    @property
+    def pending(self):
+        """
+        The updates waiting for a commit in the current thread, by connection
+        alias and savepoint ids. The commit callbacks hold the only references
+        to them: when django discards the callbacks of a rolled back atomic
+        block, or runs them, its updates are dropped from this dictionary.
+        """
+        try:
+            return self._local.pending
+        except AttributeError:
+            self._local.pending = weakref.WeakValueDictionary()
+            return self._local.pending
+
+    def add(self, sender, changes, using=None):
+        connection = transaction.get_connection(using)
+        if not connection.in_atomic_block:
+            pending = PendingUpdates(self)
+            for change in changes:
+                pending.add(sender, *change)
+            pending.send()
+            return
+
+        key = (connection.alias, tuple(connection.savepoint_ids))
+        pending = self.pending.get(key)
+        if pending is None:
+            # commit callbacks registered in a savepoint are discarded when
+            # it is rolled back, with the updates they carry
+            pending = self.pending[key] = PendingUpdates(self, using=connection.alias)
+            transaction.on_commit(pending.send, using=connection.alias)
+        for change in changes:
+            pending.add(sender, *change)
+
+    def get_pending(self, using):
+        """
+        Return the updates waiting for the commit of the given connection,
+        in the order their atomic blocks were entered
+        """
+        return [
+            pending for (alias, _), pending in self.pending.items() if alias == using
+        ]
+
+    @property
+    def executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=preferences_settings.UPDATE_SIGNALS_THREAD_POOL_SIZE,
+                    thread_name_prefix="dynamic_preferences",
+                )
+            return self._executor
+
+    def deliver(self, changes):
+        if preferences_settings.UPDATE_SIGNALS_THREAD_POOL_SIZE:
+            self.executor.submit(self._deliver_in_thread, changes)
+        else:
+            self._deliver(changes)
+
+    def _deliver(self, changes):
+        for sender, sender_changes in changes.items():
+            preferences_updated.send(sender=sender, changes=sender_changes)
+            for change in sender_changes.values():
+                preference_updated.send(sender=sender, **change)
+
+    def _deliver_in_thread(self, changes):
+        # receivers may use the database, connections of pool threads must
+        # be closed like those of request threads
+        close_old_connections()
+        try:
+            self._deliver(changes)
+        except Exception:
+            logger.exception("Error while sending preferences updates signals")
+        finally:
+            close_old_connections()
+
+
+updates_dispatcher = UpdatesDispatcher()
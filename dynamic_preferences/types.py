@@ -3,8 +3,9 @@ You'll find here the final, concrete classes of preferences you can use
 in your own project.
 
 """
+from asgiref.local import Local
 from django import forms
-from django.db.models.signals import pre_delete
+from django.db.models.signals import post_save, pre_delete
 
 from django.core.files.storage import default_storage
 
@@ -13,6 +14,10 @@ from .exceptions import MissingModel
 from dynamic_preferences.serializers import *
 from dynamic_preferences.settings import preferences_settings
 
+# tells get_field_kwargs that setup_field was given an initial value, so the
+# default, which may need database queries, is not computed for nothing
+_field_setup = Local()
+
 
 class BasePreferenceType(AbstractPreference):
     """
@@ -77,7 +82,12 @@ class BasePreferenceType(AbstractPreference):
 
     def setup_field(self, **kwargs):
         field_class = self.get("field_class")
-        field_kwargs = self.get_field_kwargs()
+        previous = getattr(_field_setup, "initial_given", False)
+        _field_setup.initial_given = "initial" in kwargs
+        try:
+            field_kwargs = self.get_field_kwargs()
+        finally:
+            _field_setup.initial_given = previous
         field_kwargs.update(kwargs)
         return field_class(**field_kwargs)
 
@@ -95,15 +105,20 @@ class BasePreferenceType(AbstractPreference):
         - :py:attr:`instance.required` defined if the value is required or not
         - :py:attr:`instance.initial` defined if the initial value
         """
-        kwargs = self.field_kwargs.copy()
-        kwargs.setdefault("label", self.get("verbose_name"))
-        kwargs.setdefault("help_text", self.get("help_text"))
-        kwargs.setdefault("widget", self.get("widget"))
-        kwargs.setdefault("required", self.get("required"))
-        kwargs.setdefault("initial", self.initial)
-        kwargs.setdefault("validators", [])
-        kwargs["validators"].append(self.validate)
-        return kwargs
+        field_kwargs = self.field_kwargs.copy()
+        field_kwargs.setdefault("label", self.get("verbose_name"))
+        field_kwargs.setdefault("help_text", self.get("help_text"))
+        field_kwargs.setdefault("widget", self.get("widget"))
+        field_kwargs.setdefault("required", self.get("required"))
+        if "initial" not in field_kwargs:
+            # overridden by setup_field anyway when it was given one
+            given = getattr(_field_setup, "initial_given", False)
+            field_kwargs["initial"] = None if given else self.initial
+        # a new list, so validators are not added to field_kwargs on each call
+        field_kwargs["validators"] = list(field_kwargs.get("validators", [])) + [
+            self.validate
+        ]
+        return field_kwargs
 
     def api_repr(self, value):
         """
@@ -265,10 +280,23 @@ def create_deletion_handler(preference):
             raw_value=preference.serializer.serialize(instance)
         )
         related_preferences.delete()
+        preference.serializer.invalidate(instance.pk)
 
     return delete_related_preferences
 
 
+def create_update_handler(preference):
+    """
+    Will generate a dynamic handler to remove the cached model instance
+    of a preference when the instance is saved
+    """
+
+    def invalidate_cached_instance(sender, instance, *args, **kwargs):
+        preference.serializer.invalidate(instance.pk)
+
+    return invalidate_cached_instance
+
+
 class ModelChoicePreference(BasePreferenceType):
     """
     A preference type that stores a reference to a model instance.
@@ -310,6 +338,13 @@ class ModelChoicePreference(BasePreferenceType):
     """
     A queryset to filter available model instances.
     """
+
+    cache_instance = False
+    """
+    Store the model instance in the preferences cache, so reading the value
+    does not query the database. The cached instance is removed when
+    the instance is saved or deleted.
+    """
     signals_handlers = {}
 
     def __init__(self, *args, **kwargs):
@@ -324,7 +359,10 @@ class ModelChoicePreference(BasePreferenceType):
         else:
             raise MissingModel
 
-        self.serializer = self.serializer_class(self.model)
+        if self.cache_instance:
+            self.serializer = self.serializer_class(self.model, cache_instance=True)
+        else:
+            self.serializer = self.serializer_class(self.model)
 
         self._setup_signals()
 
@@ -332,8 +370,12 @@ class ModelChoicePreference(BasePreferenceType):
         handler = create_deletion_handler(self)
         # We need to keep a reference to the handler or it will cause
         # weakref to die and our handler will not be called
-        self.signals_handlers["pre_delete"] = [handler]
+        self.signals_handlers = {"pre_delete": [handler]}
         pre_delete.connect(handler, sender=self.model)
+        if self.cache_instance:
+            handler = create_update_handler(self)
+            self.signals_handlers["post_save"] = [handler]
+            post_save.connect(handler, sender=self.model)
 
     def get_field_kwargs(self):
         kw = super(ModelChoicePreference, self).get_field_kwargs()
@@ -343,6 +385,8 @@ class ModelChoicePreference(BasePreferenceType):
     def api_repr(self, value):
         if not value:
             return None
+        if isinstance(value, ModelMultipleValue):
+            return list(value.pks)
         if value.__class__.__name__ == "QuerySet":
             return [val.pk for val in value]
         return value.pk
@@ -379,6 +423,19 @@ class ModelMultipleChoicePreference(ModelChoicePreference):
     serializer_class = ModelMultipleSerializer
     field_class = forms.ModelMultipleChoiceField
 
+    lazy_value = False
+    """
+    Return values as :py:class:`serializers.ModelMultipleValue`, that give
+    access to the selected primary keys without querying the database.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super(ModelMultipleChoicePreference, self).__init__(*args, **kwargs)
+        if self.lazy_value:
+            self.serializer = self.serializer_class(
+                self.model, cache_instance=self.cache_instance, lazy_value=True
+            )
+
     def _setup_signals(self):
         pass
 
@@ -423,9 +480,9 @@ class FilePreference(BasePreferenceType):
         return self.serializer_class(self)
 
     def get_field_kwargs(self):
-        kwargs = super(FilePreference, self).get_field_kwargs()
-        kwargs["required"] = self.get("required", False)
-        return kwargs
+        field_kwargs = super(FilePreference, self).get_field_kwargs()
+        field_kwargs["required"] = self.get("required", False)
+        return field_kwargs
 
     def get_upload_path(self):
         return os.path.join(
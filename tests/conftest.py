@@ -3,11 +3,15 @@ import pytest
 from django.core import cache as django_cache
 from django.contrib.auth.models import User
 
+from dynamic_preferences.cache import local_cache, request_cache
+
 
 @pytest.fixture(autouse=True)
 def cache():
     django_cache.cache.clear()
+    local_cache.clear()
     yield django_cache.cache
+    request_cache.finish()
 
 
 @pytest.fixture
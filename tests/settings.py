@@ -72,4 +72,3 @@ CACHES = {
         "LOCATION": "unique-snowflake",
     }
 }
-CACHE_DYNAMIC_PREFERENCES_SETTINGS = False
@@ -5,11 +5,13 @@ from datetime import date, timedelta, datetime, time
 from django.apps import apps
 from django.urls import reverse
 from django.core.management import call_command
+from django.db.models.signals import post_save
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.utils.timezone import make_aware
 
 from dynamic_preferences.registries import global_preferences_registry as registry
-from dynamic_preferences.models import GlobalPreferenceModel
+from dynamic_preferences.registries import preference_models
+from dynamic_preferences.models import GlobalPreferenceModel, invalidate_cache
 from dynamic_preferences.forms import global_preference_form_builder
 
 from .test_app.models import BlogEntry
@@ -198,6 +200,80 @@ def test_preference_are_updated_on_form_submission_by_section(admin_client):
     )
 
 
+def test_form_builder_loads_preferences_with_a_single_query(
+    db, django_assert_num_queries
+):
+    # missing entries are created in bulk
+    global_preference_form_builder(section="user")()
+    assert GlobalPreferenceModel.objects.filter(section="user").count() == 3
+
+    with django_assert_num_queries(1):
+        form = global_preference_form_builder(section="user")()
+
+    assert len(form.fields) == 3
+    assert form.fields["user__max_users"].initial == 100
+
+
+def test_form_builder_does_not_compute_defaults_of_stored_preferences(
+    db, django_assert_num_queries
+):
+    entry = BlogEntry.objects.create(title="Featured", content="Featured")
+    global_preference_form_builder(section="blog")()
+
+    # preferences, then the stored featured entry, but not its default
+    with django_assert_num_queries(2):
+        form = global_preference_form_builder(section="blog")()
+
+    assert form.fields["blog__featured_entry"].initial == entry
+
+
+def test_form_only_writes_changed_preferences(db, django_assert_num_queries):
+    form_class = global_preference_form_builder(section="user")
+    form = form_class(
+        data={
+            "user__max_users": 95,
+            "user__registration_allowed": False,
+            "user__items_per_page": 25,
+            "user__favorite_vegetable": "C",
+        }
+    )
+    assert form.is_valid()
+
+    # savepoint, update, release
+    with django_assert_num_queries(3):
+        form.update_preferences()
+
+    manager = registry.manager()
+    assert manager["user__max_users"] == 95
+    assert manager["user__items_per_page"] == 25
+
+
+class GlobalPreferenceModelProxy(GlobalPreferenceModel):
+    class Meta:
+        app_label = "dynamic_preferences"
+        proxy = True
+
+
+def test_cache_is_refreshed_when_saving_through_proxy_models(db):
+    manager = registry.manager()
+    manager.all()
+
+    pref = GlobalPreferenceModelProxy.objects.get(section="test", name="TestGlobal1")
+    pref.value = "via proxy"
+    pref.save()
+    assert manager["test__TestGlobal1"] == "via proxy"
+
+    # proxies defined before the preference model was registered
+    post_save.disconnect(invalidate_cache, sender=GlobalPreferenceModelProxy)
+    preference_models.connect_signals(GlobalPreferenceModel)
+    pref.value = "after registration"
+    pref.save()
+    assert manager["test__TestGlobal1"] == "after registration"
+
+    pref.delete()
+    assert manager["test__TestGlobal1"] == "default value"
+
+
 def test_template_gets_global_preferences_via_template_processor(db, client):
     global_preferences = registry.manager()
     url = reverse("dynamic_preferences.test.templateview")
@@ -1,7 +1,18 @@
+import pytest
+
+from unittest import mock
+
+from django.forms import ValidationError
 from django.urls import reverse
 
+from dynamic_preferences import types
 from dynamic_preferences.registries import global_preferences_registry as registry
 from dynamic_preferences.models import GlobalPreferenceModel
+from dynamic_preferences.cache import LocalCache, local_cache, request_cache
+from dynamic_preferences.signals import preference_updated
+from dynamic_preferences.settings import preferences_settings
+
+from .test_app.models import BlogEntry
 
 
 def test_can_get_preferences_objects_from_manager(db):
@@ -74,3 +85,442 @@ def test_invalidates_cache_when_saving_from_admin(admin_client):
 
     assert manager.cache.get(key) == "reset2"
     assert manager.all()["test__TestGlobal1"] == "reset2"
+
+
+def test_local_cache_serves_values_without_hitting_cache(
+    db, settings, django_assert_num_queries
+):
+    settings.DYNAMIC_PREFERENCES = {"ENABLE_LOCAL_CACHE": True}
+    manager = registry.manager()
+    manager.all()
+    manager["test__TestGlobal1"]
+    manager.cache.delete(manager.get_cache_key("test", "TestGlobal1"))
+    hits = local_cache.stats()["hits"]
+
+    with django_assert_num_queries(0):
+        assert manager["test__TestGlobal1"] == "default value"
+    assert local_cache.stats()["hits"] == hits + 1
+
+
+def test_local_cache_is_invalidated_on_write(db, settings):
+    settings.DYNAMIC_PREFERENCES = {"ENABLE_LOCAL_CACHE": True}
+    manager = registry.manager()
+    assert manager["test__TestGlobal1"] == "default value"
+
+    manager["test__TestGlobal1"] = "new value"
+
+    assert manager["test__TestGlobal1"] == "new value"
+    assert manager.all()["test__TestGlobal1"] == "new value"
+
+
+def test_local_cache_all(db, settings, django_assert_num_queries):
+    settings.DYNAMIC_PREFERENCES = {"ENABLE_LOCAL_CACHE": True}
+    manager = registry.manager()
+    expected = manager.all()
+
+    with django_assert_num_queries(0):
+        assert manager.all() == expected
+    # model and file preferences are never cached locally
+    assert len(local_cache) == len(expected) - 3
+
+
+def test_local_cache_is_bounded():
+    cache = LocalCache(max_size=2, timeout=None)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.stats() == {"hits": 2, "misses": 1, "evictions": 1, "size": 2}
+
+
+def test_local_cache_timeout():
+    cache = LocalCache(max_size=2, timeout=0)
+    cache.set("a", 1)
+
+    assert cache.get("a") is None
+
+
+def test_local_cache_without_timeout(settings):
+    settings.DYNAMIC_PREFERENCES = {"LOCAL_CACHE_TIMEOUT": 0}
+    assert LocalCache().timeout == 0
+
+    cache = LocalCache(timeout=None)
+    cache.set("a", 1)
+
+    assert cache.timeout is None
+    assert cache.get("a") == 1
+
+
+def test_generation_invalidates_local_cache_written_by_other_processes(db, settings):
+    settings.DYNAMIC_PREFERENCES = {"ENABLE_LOCAL_CACHE": True}
+    manager = registry.manager()
+    key = manager.get_cache_key("test", "TestGlobal1")
+    manager.all()
+    assert manager["test__TestGlobal1"] == "default value"
+
+    # another process writes the value, without touching our local cache
+    manager.cache.set(key, "remote value")
+    assert manager["test__TestGlobal1"] == "default value"
+
+    manager.bump_generation()
+    assert manager["test__TestGlobal1"] == "remote value"
+    assert manager.all()["test__TestGlobal1"] == "remote value"
+
+
+def test_generation_is_read_once_per_request(db, settings, cache):
+    settings.DYNAMIC_PREFERENCES = {"ENABLE_LOCAL_CACHE": True}
+    manager = registry.manager()
+    # the database entry is created by the first read
+    manager["test__TestGlobal1"]
+    manager["test__TestGlobal1"]
+    key = manager.get_cache_key("test", "TestGlobal1")
+
+    request_cache.start()
+    with mock.patch.object(cache, "get", wraps=cache.get) as cache_get:
+        for i in range(100):
+            assert manager["test__TestGlobal1"] == "default value"
+    # the generation, and nothing else
+    assert cache_get.call_count == 1
+
+    # another process writes the value, we see it on next request
+    manager.cache.set(key, "remote value")
+    manager.bump_generation()
+    request_cache.finish()
+    request_cache.start()
+    assert manager["test__TestGlobal1"] == "remote value"
+
+
+def test_saving_preference_bumps_generation(db, settings):
+    settings.DYNAMIC_PREFERENCES = {"ENABLE_LOCAL_CACHE": True}
+    manager = registry.manager()
+    generation = manager.get_generation()
+
+    manager["test__TestGlobal1"] = "new value"
+
+    assert manager.get_generation() > generation
+
+
+def test_generation_is_per_instance(db, settings, fake_user, henri):
+    settings.DYNAMIC_PREFERENCES = {"ENABLE_LOCAL_CACHE": True}
+    from dynamic_preferences.users.registries import user_preferences_registry
+
+    manager = user_preferences_registry.manager(instance=fake_user)
+    other_manager = user_preferences_registry.manager(instance=henri)
+    generation = manager.get_generation()
+
+    other_manager["test__TestUserPref1"] = "new value"
+
+    assert manager.get_generation() == generation
+
+
+def test_snapshot_caches_all_preferences_under_a_single_key(
+    db, settings, django_assert_num_queries
+):
+    settings.DYNAMIC_PREFERENCES = {"ENABLE_CACHE_SNAPSHOT": True}
+    manager = registry.manager()
+    expected = manager.all()
+    snapshot = manager.cache.get(manager.get_snapshot_key())
+
+    assert len(snapshot) == len(registry.preferences())
+    assert snapshot["test__TestGlobal1"] == "default value"
+
+    # individual keys are not needed anymore
+    for preference in registry.preferences():
+        manager.cache.delete(
+            manager.get_cache_key(preference.section.name, preference.name)
+        )
+    with django_assert_num_queries(0):
+        assert manager.all() == expected
+
+
+def test_snapshot_is_dropped_on_write(db, settings):
+    settings.DYNAMIC_PREFERENCES = {"ENABLE_CACHE_SNAPSHOT": True}
+    manager = registry.manager()
+    manager.all()
+
+    manager["test__TestGlobal1"] = "new value"
+
+    assert manager.cache.get(manager.get_snapshot_key()) is None
+    assert manager.all()["test__TestGlobal1"] == "new value"
+    assert manager.cache.get(manager.get_snapshot_key())["test__TestGlobal1"] == (
+        "new value"
+    )
+
+
+def test_snapshot_is_rebuilt_from_cache_after_write(
+    db, settings, django_assert_num_queries
+):
+    settings.DYNAMIC_PREFERENCES = {"ENABLE_CACHE_SNAPSHOT": True}
+    manager = registry.manager()
+    manager.all()
+    manager["test__TestGlobal1"] = "new value"
+
+    # individual keys are up to date, there is no need to read the table
+    with django_assert_num_queries(0):
+        assert manager.all()["test__TestGlobal1"] == "new value"
+    assert manager.cache.get(manager.get_snapshot_key())["test__TestGlobal1"] == (
+        "new value"
+    )
+
+
+def test_update_db_pref_uses_a_single_query(db, django_assert_num_queries):
+    manager = registry.manager()
+    manager.all()
+
+    with django_assert_num_queries(1):
+        manager["test__TestGlobal1"] = "new value"
+
+    assert manager["test__TestGlobal1"] == "new value"
+    assert GlobalPreferenceModel.objects.get(name="TestGlobal1").value == "new value"
+
+
+def test_update_db_pref_fetches_old_value_for_receivers(db, django_assert_num_queries):
+    manager = registry.manager()
+    manager.all()
+    calls = []
+
+    def receiver(sender, **kwargs):
+        calls.append(kwargs)
+
+    preference_updated.connect(receiver)
+    try:
+        with django_assert_num_queries(2):
+            manager["test__TestGlobal1"] = "new value"
+    finally:
+        preference_updated.disconnect(receiver)
+
+    assert calls[0]["old_value"] == "default value"
+    assert calls[0]["new_value"] == "new value"
+
+
+def test_update_db_pref_returns_nothing(db):
+    manager = registry.manager()
+    manager.all()
+
+    assert manager.update_db_pref("test", "TestGlobal1", "new value") is None
+    receiver = mock.MagicMock()
+    preference_updated.connect(receiver)
+    try:
+        assert manager.update_db_pref("test", "TestGlobal1", "other value") is None
+    finally:
+        preference_updated.disconnect(receiver)
+    assert receiver.call_count == 1
+
+    db_pref = manager.get_db_pref("test", "TestGlobal1")
+    assert db_pref.value == "other value"
+    db_pref.save()
+    assert GlobalPreferenceModel.objects.filter(name="TestGlobal1").count() == 1
+
+
+def test_update_db_pref_skips_unchanged_values(db, django_assert_num_queries):
+    manager = registry.manager()
+    manager.all()
+    calls = []
+
+    def receiver(sender, **kwargs):
+        calls.append(kwargs)
+
+    cache = manager.cache
+    with mock.patch.object(cache, "set_many", wraps=cache.set_many) as set_many:
+        with django_assert_num_queries(2):
+            manager["test__TestGlobal1"] = "default value"
+        assert set_many.call_count == 0
+
+        preference_updated.connect(receiver)
+        try:
+            with django_assert_num_queries(1):
+                manager["test__TestGlobal1"] = "default value"
+            assert calls == []
+
+            with django_assert_num_queries(2):
+                manager.update_db_pref("test", "TestGlobal1", "default value", force=True)
+        finally:
+            preference_updated.disconnect(receiver)
+
+        assert len(calls) == 1
+        assert set_many.call_count == 1
+
+
+def test_update_many_skips_unchanged_values(db, django_assert_num_queries):
+    manager = registry.manager()
+    manager.all()
+
+    # savepoint, select, release
+    with django_assert_num_queries(3):
+        assert manager.update_many({"test__TestGlobal1": "default value"}) == []
+
+    written = manager.update_many({"test__TestGlobal1": "default value"}, force=True)
+    assert len(written) == 1
+
+
+def test_update_db_pref_creates_missing_entry(db):
+    manager = registry.manager()
+
+    manager["test__TestGlobal1"] = "new value"
+
+    assert GlobalPreferenceModel.objects.get(name="TestGlobal1").value == "new value"
+    assert manager["test__TestGlobal1"] == "new value"
+
+
+def test_update_many(db, django_assert_num_queries):
+    manager = registry.manager()
+    manager.all()
+    GlobalPreferenceModel.objects.filter(name="TestGlobal2").delete()
+    calls = []
+
+    def receiver(sender, **kwargs):
+        calls.append(kwargs)
+
+    preference_updated.connect(receiver)
+    try:
+        # savepoint, select, update, insert, select inserted, release
+        with django_assert_num_queries(6):
+            manager.update_many(
+                {
+                    "test__TestGlobal1": "new value",
+                    "test__TestGlobal2": True,
+                    "user__max_users": 12,
+                }
+            )
+    finally:
+        preference_updated.disconnect(receiver)
+
+    assert manager["test__TestGlobal1"] == "new value"
+    assert manager["test__TestGlobal2"] is True
+    assert manager.all()["user__max_users"] == 12
+    assert GlobalPreferenceModel.objects.get(name="TestGlobal2").value is True
+    assert sorted((c["name"], c["old_value"], c["new_value"]) for c in calls) == [
+        ("TestGlobal1", "default value", "new value"),
+        # the created entry had its default value
+        ("TestGlobal2", False, True),
+        ("max_users", 100, 12),
+    ]
+
+
+def test_update_db_prefs_updates_entries_created_concurrently(db):
+    manager = registry.manager()
+    manager["test__TestGlobal1"] = "concurrent value"
+    preference = registry.get("test__TestGlobal1")
+    receiver = mock.MagicMock()
+
+    preference_updated.connect(receiver)
+    try:
+        # the entry did not exist when the caller loaded entries
+        written = manager.update_db_prefs({preference: "new value"}, db_prefs={})
+    finally:
+        preference_updated.disconnect(receiver)
+
+    assert [db_pref.pk for db_pref in written] == [
+        GlobalPreferenceModel.objects.get(name="TestGlobal1").pk
+    ]
+    assert GlobalPreferenceModel.objects.get(name="TestGlobal1").value == "new value"
+    assert manager["test__TestGlobal1"] == "new value"
+    assert receiver.call_args[1]["old_value"] == "concurrent value"
+
+
+def test_update_many_validates_all_values_first(db):
+    manager = registry.manager()
+
+    with pytest.raises(ValidationError):
+        manager.update_many({"test__TestGlobal1": "new value", "user__max_users": 1001})
+
+    assert manager["test__TestGlobal1"] == "default value"
+
+
+def test_cache_keys(db):
+    manager = registry.manager()
+
+    assert (
+        manager.get_cache_key("test", "TestGlobal1")
+        == "dynamic_preferences_GlobalPreferenceModel_test_TestGlobal1"
+    )
+    assert (
+        manager.get_cache_key("test", "missing")
+        == "dynamic_preferences_GlobalPreferenceModel_test_missing"
+    )
+    assert (
+        manager.get_generation_key()
+        == "dynamic_preferences_GlobalPreferenceModel_generation"
+    )
+
+
+def test_model_preferences_are_fetched_in_bulk(db, django_assert_num_queries):
+    first = BlogEntry.objects.create(title="First", content="First")
+    second = BlogEntry.objects.create(title="Second", content="Second")
+    manager = registry.manager()
+    preference = registry.get("blog__featured_entry")
+
+    with django_assert_num_queries(1):
+        values = manager.deserialize_many(
+            [
+                ("first", preference, str(first.pk)),
+                ("second", preference, str(second.pk)),
+                ("none", preference, preferences_settings.CACHE_NONE_VALUE),
+            ]
+        )
+
+    assert values == {"first": first, "second": second, "none": None}
+
+
+def test_lazy_and_eager_model_multiple_preferences_are_not_batched_together(db):
+    entry = BlogEntry.objects.create(title="Featured", content="Featured")
+
+    class FeaturedEntries(types.ModelMultipleChoicePreference):
+        section = types.Section("blog")
+        name = "featured_entries"
+        model = BlogEntry
+        default = None
+
+    class LazyFeaturedEntries(FeaturedEntries):
+        name = "lazy_featured_entries"
+        lazy_value = True
+
+    manager = registry.manager()
+    eager = FeaturedEntries(registry=registry)
+    lazy = LazyFeaturedEntries(registry=registry)
+    raw_value = eager.serializer.serialize([entry])
+
+    for preferences in [(eager, lazy), (lazy, eager)]:
+        values = manager.deserialize_many(
+            [(p.name, p, raw_value) for p in preferences]
+        )
+
+        assert not isinstance(values["featured_entries"], types.ModelMultipleValue)
+        assert list(values["featured_entries"]) == [entry]
+        assert isinstance(values["lazy_featured_entries"], types.ModelMultipleValue)
+        assert list(values["lazy_featured_entries"]) == [entry]
+
+
+def test_model_preferences_are_fetched_in_bulk_by_all(db, django_assert_num_queries):
+    entry = BlogEntry.objects.create(title="Featured", content="Featured")
+    manager = registry.manager()
+    manager["blog__featured_entry"] = entry
+    manager.all()
+
+    # only the model instance is fetched
+    with django_assert_num_queries(1):
+        assert manager.all()["blog__featured_entry"] == entry
+
+
+def test_cache_is_cleared_when_preference_is_deleted(db):
+    manager = registry.manager()
+    manager["test__TestGlobal1"] = "new value"
+
+    GlobalPreferenceModel.objects.get(section="test", name="TestGlobal1").delete()
+
+    assert manager["test__TestGlobal1"] == "default value"
+
+
+def test_queryset_invalidate_cache(db):
+    manager = registry.manager()
+    manager.all()
+    queryset = GlobalPreferenceModel.objects.filter(section="test", name="TestGlobal1")
+
+    queryset.update(raw_value="updated")
+    assert manager["test__TestGlobal1"] == "default value"
+
+    queryset.invalidate_cache()
+    assert manager["test__TestGlobal1"] == "updated"
@@ -1,14 +1,26 @@
 import pytest
 
+from unittest import mock
+
+from django.db import transaction
+
 from dynamic_preferences.registries import (
+    GlobalPreferenceRegistry,
     MissingPreference,
+    PreferenceModelsRegistry,
     global_preferences_registry,
 )
 from dynamic_preferences import preferences, exceptions
 from dynamic_preferences.types import IntegerPreference, StringPreference
-from dynamic_preferences.signals import preference_updated
+from dynamic_preferences.signals import (
+    preference_updated,
+    preferences_updated,
+    updates_dispatcher,
+)
+from dynamic_preferences.settings import DEFAULTS, PreferenceSettings, preferences_settings
 
 from .test_app import dynamic_preferences_registry as prefs
+from dynamic_preferences.models import GlobalPreferenceModel
 from .test_app.models import BlogEntry
 
 try:
@@ -55,6 +67,129 @@ def test_preference_order_match_register_call():
     assert [p.name for p in global_preferences_registry.preferences()][:4] == expected
 
 
+def test_registry_get_by_name_detects_collisions():
+    registry = GlobalPreferenceRegistry()
+    first = preferences.Section("first")
+    second = preferences.Section("second")
+
+    @registry.register
+    class FirstPreference(IntegerPreference):
+        section = first
+        name = "shared"
+        default = 1
+
+    @registry.register
+    class Unique(IntegerPreference):
+        section = second
+        name = "unique"
+        default = 2
+
+    with pytest.warns(UserWarning, match="shared"):
+
+        @registry.register
+        class SecondPreference(IntegerPreference):
+            section = second
+            name = "shared"
+            default = 3
+
+    assert registry.get_by_name("shared").section == first
+    assert registry.get_by_name("unique").default == 2
+    with pytest.raises(exceptions.NotFoundInRegistry):
+        registry.get_by_name("missing")
+
+
+def test_registry_caches_preferences_until_register():
+    registry = GlobalPreferenceRegistry()
+
+    @registry.register
+    class First(IntegerPreference):
+        section = preferences.Section("section")
+        name = "first"
+        default = 1
+
+    all_preferences = registry.preferences()
+    assert isinstance(all_preferences, tuple)
+    assert registry.preferences() is all_preferences
+    assert registry.preferences(section="section") == all_preferences
+
+    @registry.register
+    class Second(IntegerPreference):
+        section = preferences.Section("section")
+        name = "second"
+        default = 2
+
+    assert [p.name for p in registry.preferences()] == ["first", "second"]
+    assert [p.name for p in registry.preferences(section="section")] == [
+        "first",
+        "second",
+    ]
+    assert registry.preferences_by_identifier() == {
+        "section__first": registry.get("section__first"),
+        "section__second": registry.get(name="second", section="section"),
+    }
+
+
+def test_frozen_registry_rejects_registrations():
+    registry = GlobalPreferenceRegistry()
+
+    @registry.register
+    class First(IntegerPreference):
+        section = preferences.Section("section")
+        name = "first"
+        default = 1
+
+    models_registry = PreferenceModelsRegistry()
+    models_registry.freeze()
+    models_registry.register(GlobalPreferenceModel, registry)
+
+    assert registry.frozen is True
+    assert registry.get("section__first").default == 1
+    with pytest.raises(exceptions.RegistryFrozen):
+
+        @registry.register
+        class Second(IntegerPreference):
+            section = preferences.Section("section")
+            name = "second"
+            default = 2
+
+    assert [p.name for p in registry.preferences()] == ["first"]
+
+
+def test_preferences_settings_are_reloaded_on_change(settings):
+    assert preferences_settings.SECTION_KEY_SEPARATOR == "__"
+
+    settings.DYNAMIC_PREFERENCES = {"SECTION_KEY_SEPARATOR": "."}
+    assert preferences_settings.SECTION_KEY_SEPARATOR == "."
+
+    settings.CACHE_DYNAMIC_PREFERENCES_SETTINGS = False
+    settings.DYNAMIC_PREFERENCES["SECTION_KEY_SEPARATOR"] = ":"
+    assert preferences_settings.SECTION_KEY_SEPARATOR == ":"
+
+    with pytest.raises(AttributeError):
+        preferences_settings.UNKNOWN_SETTING
+
+
+def test_preferences_settings_accept_custom_defaults(settings):
+    custom_settings = PreferenceSettings(dict(DEFAULTS, EXTRA=1))
+    assert custom_settings.EXTRA == 1
+
+    settings.DYNAMIC_PREFERENCES = {"EXTRA": 2}
+    custom_settings.reload()
+    assert custom_settings.EXTRA == 2
+    assert custom_settings.SECTION_KEY_SEPARATOR == "__"
+
+
+def test_identifiers_follow_section_key_separator(db, settings):
+    manager = global_preferences_registry.manager()
+    assert "user__max_users" in manager.all()
+
+    settings.DYNAMIC_PREFERENCES = {"SECTION_KEY_SEPARATOR": "."}
+
+    assert "user.max_users" in manager.all()
+    assert manager["user.max_users"] == 100
+    assert "user.max_users" in global_preferences_registry.preferences_by_identifier()
+
+
 def test_preferences_manager_get(db):
     global_preferences = global_preferences_registry.manager()
     assert global_preferences["no_section"] is False
@@ -189,6 +324,31 @@ def test_get_field_uses_field_kwargs():
     assert kwargs["required"] is False
 
 
+def test_setup_field_works_with_overridden_get_field_kwargs():
+    get_default = MagicMock(return_value="default")
+
+    class P(StringPreference):
+        name = "test"
+
+        def get_default(self):
+            return get_default()
+
+        def get_field_kwargs(self):
+            kwargs = super().get_field_kwargs()
+            kwargs["max_length"] = 10
+            return kwargs
+
+    p = P()
+
+    field = p.setup_field(initial="stored")
+    assert field.initial == "stored"
+    assert field.max_length == 10
+    assert get_default.call_count == 0
+
+    assert p.field.initial == "default"
+    assert get_default.call_count == 1
+
+
 def test_preferences_manager_signal(db):
     global_preferences = global_preferences_registry.manager()
     global_preferences["no_section"] = False
@@ -204,3 +364,79 @@ def test_preferences_manager_signal(db):
         "old_value": False,
         "new_value": True,
     }.items() <= call_args.items()
+
+
+def test_preferences_updated_signal_is_coalesced_on_commit(
+    db, settings, django_capture_on_commit_callbacks
+):
+    global_preferences = global_preferences_registry.manager()
+    global_preferences.all()
+    global_preferences["no_section"] = False
+    settings.DYNAMIC_PREFERENCES = {"COALESCE_UPDATE_SIGNALS": True}
+    batch_receiver = MagicMock()
+    receiver = MagicMock()
+    preferences_updated.connect(batch_receiver)
+    preference_updated.connect(receiver)
+    try:
+        with django_capture_on_commit_callbacks(execute=True):
+            global_preferences["no_section"] = True
+            global_preferences["user__max_users"] = 12
+            global_preferences["no_section"] = False
+            assert batch_receiver.call_count == 0
+    finally:
+        preferences_updated.disconnect(batch_receiver)
+        preference_updated.disconnect(receiver)
+
+    assert batch_receiver.call_count == 1
+    assert batch_receiver.call_args[1]["changes"] == {
+        "no_section": {
+            "section": None,
+            "name": "no_section",
+            "old_value": False,
+            "new_value": False,
+        },
+        "user__max_users": {
+            "section": "user",
+            "name": "max_users",
+            "old_value": 100,
+            "new_value": 12,
+        },
+    }
+    assert receiver.call_count == 2
+
+
+def test_preferences_updated_signal_skips_rolled_back_savepoints(
+    db, settings, django_capture_on_commit_callbacks
+):
+    global_preferences = global_preferences_registry.manager()
+    global_preferences.all()
+    settings.DYNAMIC_PREFERENCES = {"COALESCE_UPDATE_SIGNALS": True}
+    batch_receiver = MagicMock()
+    preferences_updated.connect(batch_receiver)
+    try:
+        with django_capture_on_commit_callbacks(execute=True):
+            global_preferences["user__max_users"] = 12
+            try:
+                with transaction.atomic():
+                    global_preferences["no_section"] = True
+                    raise ValueError
+            except ValueError:
+                pass
+            with transaction.atomic():
+                global_preferences["user__items_per_page"] = 10
+    finally:
+        preferences_updated.disconnect(batch_receiver)
+
+    assert GlobalPreferenceModel.objects.get(name="no_section").value is False
+    assert batch_receiver.call_count == 1
+    assert list(batch_receiver.call_args[1]["changes"]) == [
+        "user__max_users",
+        "user__items_per_page",
+    ]
+
+
+def test_updates_delivered_in_threads_close_connections():
+    with mock.patch("dynamic_preferences.signals.close_old_connections") as close:
+        updates_dispatcher._deliver_in_thread({})
+
+    assert close.call_count == 2
@@ -284,6 +284,44 @@ def test_multiple_deserialization():
     ]
 
 
+def test_multiple_roundtrip_with_separators():
+    s = serializers.MultipleSerializer
+    s.sort = False
+    try:
+        for value in [["a,", "b"], [",a", "b"], ["a,,", "b"], ["a", "b,,c", "d"]]:
+            assert s.deserialize(s.serialize(value)) == value
+    finally:
+        s.sort = True
+
+
+def test_multiple_deserialization_of_large_lists():
+    s = serializers.MultipleSerializer
+    value = sorted("tag,{}".format(i) for i in range(5000))
+
+    assert s.deserialize(s.serialize(value)) == value
+
+
+def test_deserialized_values_are_memoized():
+    serializers.memoized_to_python.cache_clear()
+    s = serializers.DateTimeSerializer
+
+    assert s.deserialize("2016-01-01T12:00:00") == datetime(2016, 1, 1, 12)
+    assert s.deserialize("2016-01-01T12:00:00") == datetime(2016, 1, 1, 12)
+    assert serializers.memoized_to_python.cache_info().hits == 1
+
+    with pytest.raises(s.exception):
+        s.deserialize("not a datetime")
+
+
+def test_memoized_multiple_values_are_copies():
+    s = serializers.MultipleSerializer
+
+    value = s.deserialize("a,b")
+    value.append("c")
+
+    assert s.deserialize("a,b") == ["a", "b"]
+
+
 def test_model_multiple_serialization(blog_entries):
     s = serializers.ModelMultipleSerializer(BlogEntry)
     blog_entries = BlogEntry.objects.all()
@@ -302,6 +340,28 @@ def test_model_multiple_deserialization(blog_entries):
     assert list(s.deserialize(pks)) == list(blog_entries)
 
 
+def test_model_multiple_lazy_deserialization(blog_entries, django_assert_num_queries):
+    s = serializers.ModelMultipleSerializer(BlogEntry, lazy_value=True)
+    entries = list(BlogEntry.objects.order_by("pk"))
+    raw_value = s.serialize(BlogEntry.objects.all())
+
+    with django_assert_num_queries(0):
+        value = s.deserialize(raw_value)
+        assert value.pks == [e.pk for e in entries]
+        assert len(value) == 2
+        assert entries[0] in value
+        assert entries[1].pk in value
+        assert 0 not in value
+        assert s.serialize(value) == raw_value
+
+    with django_assert_num_queries(1):
+        assert list(value.order_by("pk")) == entries
+
+    empty = s.deserialize("")
+    assert not empty
+    assert list(empty) == []
+
+
 def test_model_multiple_single_serialization(blog_entries):
     s = serializers.ModelMultipleSerializer(BlogEntry)
     blog_entry = BlogEntry.objects.all().first()
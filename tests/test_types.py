@@ -283,6 +283,51 @@ def test_model_choice_preference(blog_entry):
     assert in_db.raw_value == str(blog_entry.pk)
 
 
+def test_model_choice_preference_can_cache_instance(
+    blog_entry, django_assert_num_queries
+):
+    class CachedEntry(types.ModelChoicePreference):
+        section = types.Section("blog")
+        name = "cached_entry"
+        model = BlogEntry
+        default = None
+        cache_instance = True
+
+    preference = CachedEntry(registry=global_preferences_registry)
+    raw_value = preference.serializer.serialize(blog_entry)
+
+    with django_assert_num_queries(1):
+        assert preference.serializer.deserialize(raw_value) == blog_entry
+        assert preference.serializer.deserialize(raw_value).title == blog_entry.title
+
+    blog_entry.title = "Updated"
+    blog_entry.save()
+    assert preference.serializer.deserialize(raw_value).title == "Updated"
+
+    pk = blog_entry.pk
+    blog_entry.delete()
+    with pytest.raises(preference.serializer.exception):
+        preference.serializer.deserialize(str(pk))
+
+
+def test_model_multiple_choice_preference_lazy_value(blog_entry):
+    class FeaturedEntries(types.ModelMultipleChoicePreference):
+        section = types.Section("blog")
+        name = "lazy_featured_entries"
+        model = BlogEntry
+        default = None
+        lazy_value = True
+
+    preference = FeaturedEntries(registry=global_preferences_registry)
+    value = preference.serializer.deserialize(
+        preference.serializer.serialize([blog_entry])
+    )
+
+    assert isinstance(value, types.ModelMultipleValue)
+    assert preference.api_repr(value) == [blog_entry.pk]
+    assert list(value) == [blog_entry]
+
+
 def test_deleting_model_also_delete_preference(blog_entry):
     global_preferences = global_preferences_registry.manager()
     global_preferences["blog__featured_entry"] = blog_entry
@@ -1,14 +1,21 @@
 import json
+import pickle
 import pytest
 
+from unittest import mock
+
 from django.urls import reverse
 from django.contrib.auth.models import User
 from django.db import IntegrityError
 
+from dynamic_preferences.cache import request_cache
+from dynamic_preferences.registries import prefetch_preferences
+from dynamic_preferences.models import PreferencesQuerySet
 from dynamic_preferences.users.registries import user_preferences_registry as registry
 from dynamic_preferences.users.models import UserPreferenceModel
 from dynamic_preferences.users import serializers
 from dynamic_preferences.managers import PreferencesManager
+from dynamic_preferences.signals import preference_updated
 from dynamic_preferences.users.forms import user_preference_form_builder
 
 
@@ -19,6 +26,22 @@ def test_adding_user_create_default_preferences(db):
     assert len(u.preferences) == len(registry.preferences())
 
 
+def test_missing_preferences_are_created_in_bulk(fake_user, django_assert_num_queries):
+    UserPreferenceModel.objects.filter(instance=fake_user).delete()
+    manager = registry.manager(instance=fake_user)
+
+    # select existing entries, insert missing ones, fetch them back
+    with django_assert_num_queries(3):
+        values = manager.all()
+
+    assert values["test__TestUserPref1"] == "default value"
+    assert UserPreferenceModel.objects.filter(instance=fake_user).count() == len(
+        registry.preferences()
+    )
+    with django_assert_num_queries(0):
+        assert manager.all() == values
+
+
 def test_manager_is_attached_to_each_referenced_instance(fake_user):
     assert isinstance(fake_user.preferences, PreferencesManager) is True
 
@@ -240,3 +263,202 @@ def test_update_multiple_preferences_with_validation_errors_rollback(
 
     assert pref1.value == pref1.preference.default
     assert pref2.value == pref2.preference.default
+
+
+def test_sparse_storage_does_not_create_entries_on_read(fake_user, settings):
+    settings.DYNAMIC_PREFERENCES = {"ENABLE_SPARSE_STORAGE": True}
+    manager = registry.manager(instance=fake_user)
+
+    assert manager["test__TestUserPref1"] == "default value"
+    assert manager["user__favorite_vegetables"] == ["C", "P"]
+    assert manager.all()["misc__is_zombie"] is True
+    assert manager.get_db_pref(section="misc", name="is_zombie").pk is None
+    assert not UserPreferenceModel.objects.filter(instance=fake_user).exists()
+
+    manager["test__TestUserPref1"] = "new value"
+
+    assert UserPreferenceModel.objects.get(instance=fake_user).value == "new value"
+    assert manager["test__TestUserPref1"] == "new value"
+    assert manager.all()["test__TestUserPref1"] == "new value"
+
+
+def test_sparse_storage_first_write_sends_update_signal(fake_user, settings):
+    settings.DYNAMIC_PREFERENCES = {"ENABLE_SPARSE_STORAGE": True}
+    manager = registry.manager(instance=fake_user)
+    receiver = mock.MagicMock()
+    preference_updated.connect(receiver)
+    try:
+        manager["test__TestUserPref1"] = "new value"
+        manager.update_many({"misc__is_zombie": False, "misc__favourite_colour": "Green"})
+    finally:
+        preference_updated.disconnect(receiver)
+
+    assert [call.kwargs for call in receiver.call_args_list] == [
+        {
+            "signal": preference_updated,
+            "sender": PreferencesManager,
+            "section": "test",
+            "name": "TestUserPref1",
+            "old_value": "default value",
+            "new_value": "new value",
+        },
+        {
+            "signal": preference_updated,
+            "sender": PreferencesManager,
+            "section": "misc",
+            "name": "is_zombie",
+            "old_value": True,
+            "new_value": False,
+        },
+    ]
+    assert UserPreferenceModel.objects.filter(instance=fake_user).count() == 3
+
+
+def test_sparse_storage_caches_defaults(
+    fake_user, settings, cache, django_assert_num_queries
+):
+    settings.DYNAMIC_PREFERENCES = {"ENABLE_SPARSE_STORAGE": True}
+    manager = registry.manager(instance=fake_user)
+    manager.all()
+
+    assert cache.get(manager.get_cache_key("test", "TestUserPref1")) == (
+        "__dynamic_preferences_default_value"
+    )
+    with django_assert_num_queries(0):
+        assert manager["test__TestUserPref1"] == "default value"
+        manager["user__favorite_vegetables"].append("T")
+        assert manager["user__favorite_vegetables"] == ["C", "P"]
+
+
+def test_bulk_manager_loads_preferences_of_many_instances(
+    fake_user, henri, django_assert_num_queries
+):
+    henri.preferences["test__TestUserPref1"] = "henri value"
+    users = list(User.objects.order_by("pk"))
+
+    # select existing entries, insert missing ones, fetch them back
+    with django_assert_num_queries(3):
+        values = registry.bulk_manager(users)
+        assert values[fake_user]["test__TestUserPref1"] == "default value"
+        assert values[henri]["test__TestUserPref1"] == "henri value"
+
+    assert len(values) == 2
+    assert values[fake_user] == fake_user.preferences.all()
+    assert values[henri] == henri.preferences.all()
+
+    with django_assert_num_queries(0):
+        values = registry.bulk_manager(users, preferences=["misc__is_zombie"])
+        assert values[henri] == {"misc__is_zombie": True}
+
+
+def test_prefetch_preferences(fake_user, henri, django_assert_num_queries):
+    henri.preferences["misc__favourite_colour"] = "Purple"
+    users = prefetch_preferences(
+        User.objects.order_by("pk"), "misc__favourite_colour", "misc__is_zombie"
+    )
+
+    with django_assert_num_queries(0):
+        assert users[0].preferences["misc__favourite_colour"] == "Green"
+        assert users[1].preferences["misc__favourite_colour"] == "Purple"
+        assert users[1].preferences["misc__is_zombie"] is True
+
+
+def test_prefetched_preferences_are_dropped_on_write(fake_user):
+    user = prefetch_preferences([fake_user])[0]
+
+    user.preferences["misc__favourite_colour"] = "Purple"
+
+    assert user.preferences["misc__favourite_colour"] == "Purple"
+    assert user.preferences.all()["misc__favourite_colour"] == "Purple"
+
+
+def test_queryset_can_prefetch_preferences(
+    fake_user, henri, django_assert_num_queries
+):
+    queryset = PreferencesQuerySet(User).order_by("pk")
+    # one query for users, then the preferences ones
+    with django_assert_num_queries(4):
+        users = list(queryset.prefetch_preferences().filter(pk__gt=0))
+
+    with django_assert_num_queries(0):
+        assert users[0].preferences.all() == users[1].preferences.all()
+        assert users[1].preferences["misc__is_zombie"] is True
+
+
+def test_manager_is_memoized_on_instance(fake_user, cache, django_assert_num_queries):
+    assert fake_user.preferences is fake_user.preferences
+
+    request_cache.start()
+    assert fake_user.preferences["misc__favourite_colour"] == "Green"
+    cache.clear()
+    with django_assert_num_queries(0):
+        assert fake_user.preferences["misc__favourite_colour"] == "Green"
+
+    # values are only kept until the end of the request
+    request_cache.finish()
+    fake_user.preferences.queryset.update(raw_value="Purple")
+    assert fake_user.preferences["misc__favourite_colour"] == "Purple"
+
+
+def test_memoized_values_are_shared_by_copies_of_an_instance(fake_user):
+    request_cache.start()
+    user = User.objects.get(pk=fake_user.pk)
+    assert user.preferences["misc__favourite_colour"] == "Green"
+    user.preferences["user__favorite_vegetables"].append("T")
+
+    fake_user.preferences["misc__favourite_colour"] = "Purple"
+
+    assert user.preferences["misc__favourite_colour"] == "Purple"
+    assert user.preferences.all()["misc__favourite_colour"] == "Purple"
+    assert user.preferences["user__favorite_vegetables"] == ["C", "P"]
+    user.preferences.all()["user__favorite_vegetables"].append("T")
+    assert user.preferences.all()["user__favorite_vegetables"] == ["C", "P"]
+
+
+def test_memoized_manager_is_refreshed_on_write(fake_user):
+    assert fake_user.preferences["misc__favourite_colour"] == "Green"
+
+    registry.manager(instance=fake_user).update_db_pref(
+        "misc", "favourite_colour", "Purple"
+    )
+    assert fake_user.preferences["misc__favourite_colour"] == "Purple"
+
+    pref = fake_user.preferences.get_db_pref("misc", "favourite_colour")
+    pref.value = "Blue"
+    pref.save()
+    assert fake_user.preferences["misc__favourite_colour"] == "Blue"
+
+
+def test_instance_with_memoized_manager_can_be_pickled(fake_user):
+    fake_user.preferences.all()
+
+    user = pickle.loads(pickle.dumps(fake_user))
+
+    assert user.preferences.instance is user
+    assert user.preferences.prefetched == {}
+    assert user.preferences["misc__favourite_colour"] == "Green"
+
+
+def test_cache_keys_follow_instance_primary_key(db):
+    user = User(username="unsaved")
+    manager = registry.manager(instance=user)
+    assert manager.get_cache_key("test", "TestUserPref1") == (
+        "dynamic_preferences_UserPreferenceModel_None_test_TestUserPref1"
+    )
+
+    user.save()
+    assert manager.get_cache_key("test", "TestUserPref1") == (
+        "dynamic_preferences_UserPreferenceModel_{}_test_TestUserPref1".format(user.pk)
+    )
+
+
+def test_queryset_invalidate_cache_per_instance(fake_user, fake_admin):
+    fake_user.preferences.all()
+    fake_admin.preferences.all()
+    queryset = UserPreferenceModel.objects.filter(section="test", name="TestUserPref1")
+
+    queryset.update(raw_value="updated")
+    queryset.invalidate_cache()
+
+    for user in User.objects.filter(pk__in=[fake_user.pk, fake_admin.pk]):
+        assert user.preferences["test__TestUserPref1"] == "updated"